@@ -1,14 +1,16 @@
 import streamlit as st
-import pymupdf as fitz
-import re
-import json
-import hashlib
-from datetime import datetime
-from io import BytesIO
-from docx import Document
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib.pagesizes import letter
+import html
+import os
+from contractai.audit import AuditLog, audit_record
+from contractai.audit_store import AuditStore
+from contractai.cache import AnalysisCache, ReportCache, upload_key
+from contractai.clause_index import ClauseIndex
+from contractai.metrics import serve_metrics
+from contractai.patterns import PATTERNS
+from contractai.pipeline import CONTRACT_KEYWORDS, analysis_version, document_text, stream_contract
+from contractai.report import ReportRenderer, report_data
+from contractai.templates import open_templates
+from contractai.text_index import TextIndex
 
 st.set_page_config(page_title="ContractAI", layout="wide")
 
@@ -19,194 +21,164 @@ uploaded_file = st.sidebar.file_uploader(
     "📎 Upload Contract (PDF / DOCX / TXT)",
     type=["pdf", "docx", "txt"]
 )
+prerender_reports = st.sidebar.checkbox("Pre-render PDF reports in the background", value=False)
+trace_memory = st.sidebar.checkbox("Track peak memory per stage (tracemalloc, slower)", value=False)
 
-def normalize_hindi(text):
-    hindi_map = {
-        "समझौता": "agreement", "कर्मचारी": "employee", "नियोक्ता": "employer",
-        "वेतन": "salary", "समाप्ति": "termination", "भुगतान": "payment",
-        "कानून": "law", "न्यायालय": "court", "गोपनीय": "confidential",
-        "क्षतिपूर्ति": "indemnity", "प्रतिस्पर्धा": "non compete",
-    }
-    for hi, en in hindi_map.items():
-        text = text.replace(hi, en)
-    return text
-
-def extract_text(file_obj, name):
-    if name.endswith(".pdf"):
-        pdf = fitz.open(stream=file_obj, filetype="pdf")
-        return " ".join(page.get_text() for page in pdf)
-    elif name.endswith(".docx"):
-        doc = Document(file_obj)
-        return "\n".join(p.text for p in doc.paragraphs)
-    return file_obj.getvalue().decode("utf-8")
-
-def extract_parties(text):
-    parties = {}
-    landlord = re.search(r"Landlord[:\s]+([A-Z][a-zA-Z\s&.,]+?)(?=\n|AND|$)", text, re.I)
-    tenant = re.search(r"Tenant[:\s]+([A-Z][a-zA-Z\s&.,]+?)(?=\n|$)", text, re.I)
-    
-    if landlord: parties["Landlord"] = landlord.group(1).strip()
-    if tenant: parties["Tenant"] = tenant.group(1).strip()
-    
-    if not parties:
-        between_match = re.search(r"BETWEEN\s+(.+?)(?:AND|\n{2,})", text, re.I | re.DOTALL)
-        if between_match:
-            party1 = between_match.group(1).strip()
-            and_match = re.search(r"AND\s+(.+?)(?=\n{2,}|\()", text, re.I | re.DOTALL)
-            if and_match:
-                party2 = and_match.group(1).strip().split(':')[0].strip()
-                parties["Party 1"] = party1
-                parties["Party 2"] = party2
-    
-    return parties if parties else {"Party 1": "Detected", "Party 2": "Detected"}
-
-def extract_amounts(text):
-    patterns = [
-        r"(?:INR|₹|Rs\.?)\s*[\d,]+(?:\.\d+)?",
-        r"\d{1,3}(?:,\d{3})+(?:\.\d+)?\s*(?:Lakhs?|Crores?)",
-        r"(?:salary|rent|payment|amount|deposit)\s+of\s+(?:INR|₹|Rs\.?)?[\d,]+"
-    ]
-    all_amounts = []
-    for pattern in patterns:
-        all_amounts.extend(re.findall(pattern, text, re.I))
-    clean_amounts = [amt.strip() for amt in all_amounts if len(amt.strip()) > 4 and re.search(r'[\d,]{3,}', amt.strip())]
-    return list(set(clean_amounts))
-
-def extract_jurisdiction(text):
-    jurisdiction = {}
-    law_patterns = [
-        r"governed by the laws? of\s+([A-Za-z\s]+?)(?=,|;| $)",
-        r"laws? of\s+([A-Za-z\s]+?)(?=governing|$)"
-    ]
-    for pattern in law_patterns:
-        match = re.search(pattern, text, re.I)
-        if match:
-            jurisdiction["Governing Law"] = match.group(1).strip()
-            break
-    
-    court_patterns = [
-        r"courts?\s+(?:at|in|of)\s+([A-Za-z\s]+?)(?:\s+shall|$)",
-        r"exclusive jurisdiction.*?([A-Za-z\s]+)",
-        r"([A-Za-z\s]+?)\s+courts?\s+(?:shall|have)"
-    ]
-    for pattern in court_patterns:
-        match = re.search(pattern, text, re.I)
-        if match:
-            jurisdiction["Jurisdiction"] = match.group(1).strip()
-            break
-    return jurisdiction
-
-def classify_contract(text):
-    t = text.lower()
-    if any(word in t for word in ["employee", "salary", "employment"]): return "EMPLOYMENT"
-    if any(word in t for word in ["lease", "rent", "tenant", "landlord"]): return "LEASE"
-    if any(word in t for word in ["partner", "partnership"]): return "PARTNERSHIP"
-    if any(word in t for word in ["service", "vendor"]): return "SERVICE"
-    return "GENERAL"
-
-def extract_clauses(text):
-    clauses = re.split(r'\n\d+\.|Clause\s+\d+|Section\s+\d+', text)
-    return [c.strip() for c in clauses if len(c.strip()) > 25]
-
-RISK_RULES = {
-    "terminate immediate": ("HIGH", "Employer can terminate without notice"),
-    "without notice": ("HIGH", "No notice or severance protection"),
-    "non compete": ("HIGH", "Restricts future employment"),
-    "two years": ("HIGH", "Excessive non-compete duration"),
-    "perpetual": ("HIGH", "Unlimited lifelong obligation"),
-    "confidentiality": ("MEDIUM", "Long-term confidentiality obligation"),
-    "indemnity": ("HIGH", "Unlimited financial liability"),
-    "arbitration": ("MEDIUM", "Dispute resolution outside courts")
-}
-
-def analyze_clause(clause):
-    text = clause.lower()
-    levels, reasons = [], []
-    for term, (level, reason) in RISK_RULES.items():
-        if term in text:
-            levels.append(level)
-            reasons.append(reason)
-    
-    risk = "HIGH" if "HIGH" in levels else "MEDIUM" if "MEDIUM" in levels else "LOW"
-    explanation = (
-        "This clause significantly disadvantages one party and may lead to legal/financial harm."
-        if risk == "HIGH" else "This clause creates some imbalance or future uncertainty."
-        if risk == "MEDIUM" else "This clause is generally standard and low risk."
-    )
-    
-    suggestion = None
-    if risk == "HIGH" and any(term in text for term in ["terminate", "termination"]):
-        suggestion = "Add 30-day written notice or salary in lieu of notice."
-    elif risk == "HIGH" and "non compete" in text:
-        suggestion = "Limit to 6 months and specific competitors only."
-    elif risk == "HIGH" and "perpetual" in text:
-        suggestion = "Restrict to 2-3 years post-termination."
-    
-    return {"text": clause[:300], "risk": risk, "reasons": reasons, "explanation": explanation, "suggestion": suggestion}
-
-def contract_risk(analysed):
-    if any(c["risk"] == "HIGH" for c in analysed): return "HIGH"
-    if any(c["risk"] == "MEDIUM" for c in analysed): return "MEDIUM"
-    return "LOW"
-
-def generate_pdf(data):
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    styles = getSampleStyleSheet()
-    story = []
-    
-    story.append(Paragraph("ContractAI – Detailed Legal Analysis Report", styles["Title"]))
-    story.append(Spacer(1, 12))
-    
-    story.append(Paragraph(f"<b>Contract Type:</b> {data['type']}", styles["Normal"]))
-    story.append(Paragraph(f"<b>Overall Risk:</b> {data['risk']}", styles["Normal"]))
-    story.append(Spacer(1, 12))
-    
-    story.append(Paragraph("<b>Identified Parties</b>", styles["Heading2"]))
-    for role, name in data["parties"].items():
-        story.append(Paragraph(f"{role}: {name}", styles["Normal"]))
-    
-    story.append(Spacer(1, 12))
-    story.append(Paragraph("<b>Key Findings</b>", styles["Heading2"]))
-    story.append(Paragraph(f"Amounts found: {', '.join(data.get('amounts', []))}", styles["Normal"]))
-    story.append(Paragraph(f"Jurisdiction: {data.get('jurisdiction', 'Not specified')}", styles["Normal"]))
-    
-    story.append(Spacer(1, 12))
-    story.append(Paragraph("<b>Clause Analysis</b>", styles["Heading2"]))
-    for i, c in enumerate(data["clauses"], 1):
-        story.append(Spacer(1, 8))
-        story.append(Paragraph(f"<b>Clause {i} – Risk: {c['risk']}</b>", styles["Normal"]))
-        story.append(Paragraph(c["text"][:200] + "...", styles["Normal"]))
-        story.append(Paragraph(f"Explanation: {c['explanation']}", styles["Normal"]))
+CACHE_DIR = ".contractai_cache"
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+REPORT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+CLAUSES_PER_PAGE = 20
+AUDIT_LOG_PATH = "audit_log.json"
+AUDIT_DB_PATH = "audit.db"
+TEMPLATES_DB_PATH = "templates.db"
+CLAUSE_INDEX_PATH = "clause_index"
+TEXT_INDEX_PATH = "text_index"
+TEXT_INDEX_SEGMENT_TOKENS = 1_000_000
+TEXT_INDEX_FLUSH_SECONDS = 30  # new uploads become searchable within this delay
+TEXT_SEARCH_RESULTS = 20
+SIMILAR_CLAUSES = 10
+SOURCE_CONTEXT_CHARS = 300
+RISK_LEVELS = ("LOW", "MEDIUM", "HIGH")
+METRICS_PORT = int(os.environ.get("CONTRACTAI_METRICS_PORT", "0"))  # 0 disables the /metrics endpoint
+
+@st.cache_resource
+def get_cache():
+    return AnalysisCache(CACHE_DIR, analysis_version(), CACHE_MAX_BYTES)
+
+@st.cache_resource
+def get_report_renderer():
+    return ReportRenderer(ReportCache(os.path.join(CACHE_DIR, "reports"), analysis_version(), REPORT_CACHE_MAX_BYTES))
+
+@st.cache_resource
+def get_metrics_server():
+    return serve_metrics(METRICS_PORT) if METRICS_PORT else None
+
+@st.cache_resource
+def get_templates():
+    return open_templates(TEMPLATES_DB_PATH)
+
+@st.cache_resource
+def get_clause_index():
+    return ClauseIndex(CLAUSE_INDEX_PATH)
+
+@st.cache_resource
+def get_text_index():
+    return TextIndex(TEXT_INDEX_PATH, TEXT_INDEX_SEGMENT_TOKENS, TEXT_INDEX_FLUSH_SECONDS)
+
+@st.cache_resource
+def get_audit_log():
+    store = AuditStore(AUDIT_DB_PATH)
+    if store.count() == 0:
+        store.import_logs(AUDIT_LOG_PATH)
+    return AuditLog(AUDIT_LOG_PATH, store=store)
+
+@st.cache_data(max_entries=4, show_spinner="Loading document text...")
+def get_document_text(key, _file_content, name):
+    return document_text(_file_content, name)
+
+def render_source(c, text):
+    start, end = c["span"]["start"], c["span"]["end"]
+    parts, pos = [html.escape(text[max(0, start - SOURCE_CONTEXT_CHARS):start]), "<mark>"], start
+    for m in c["matches"]:
+        if start + m["start"] < pos:
+            continue
+        parts += [html.escape(text[pos:start + m["start"]]), f"<b>{html.escape(text[start + m['start']:start + m['end']])}</b>"]
+        pos = start + m["end"]
+    parts += [html.escape(text[pos:end]), "</mark>", html.escape(text[end:end + SOURCE_CONTEXT_CHARS])]
+    body = "".join(parts).replace("\n", "<br>")  # a blank line would end the HTML block
+    st.markdown(f'<div style="white-space: pre-wrap">{body}</div>', unsafe_allow_html=True)
+
+def clause_changes(template, analysed):
+    """Per clause, a short label of how it changed since the previous version, and the risk delta."""
+    changes = []
+    for i, (status, before, c) in enumerate(zip(template["clauses"], template["previous"], analysed)):
+        risk_before = template["previous_risk"][i]
+        delta = RISK_LEVELS.index(c["risk"]) - RISK_LEVELS.index(risk_before) if risk_before else None
+        if status == "new":
+            label = "New"
+        elif status == "modified":
+            label = f"Modified from clause {before + 1}"
+        elif status == "moved":
+            label = f"Moved from clause {before + 1}"
+        else:
+            label = ""
+        if delta:
+            label += f" · risk {risk_before} → {c['risk']} ({delta:+d})"
+        changes.append((status, label.strip(" ·"), delta))
+    return changes
+
+def render_clause(i, c, text=None, change=None):
+    label = f" | {change[1]}" if change and change[1] else ""
+    with st.expander(f"Clause {i} | Risk: {c['risk']} ({len(c['reasons'])} issues){label}"):
+        span = c.get("span")
+        if span:
+            st.caption(f"{span['heading'] or 'Preamble'} · characters {span['start']:,}–{span['end']:,}")
+        if text is not None and span:
+            render_source(c, text)
+        else:
+            st.write(c["text"])
+        st.info(c["explanation"])
+        if c["reasons"]:
+            st.warning(f"Risk factors: {', '.join(c['reasons'])}")
         if c["suggestion"]:
-            story.append(Paragraph(f"Suggested Change: {c['suggestion']}", styles["Normal"]))
-    
-    doc.build(story)
-    buffer.seek(0)
-    return buffer.getvalue()
+            st.success(f"💡 Fix: {c['suggestion']}")
+
+get_metrics_server()
 
 if uploaded_file is not None:
-    with st.spinner("🔍 Analyzing contract..."):
-        file_content = uploaded_file.read()
-        text = extract_text(BytesIO(file_content), uploaded_file.name)
-        
-        if re.search(r'[\u0900-\u097F]', text):
-            text = normalize_hindi(text)
-        
-        parties = extract_parties(text)
-        amounts = extract_amounts(text)
-        jurisdiction = extract_jurisdiction(text)
-        clauses = extract_clauses(text)
-        analysed = [analyze_clause(c) for c in clauses[:10]]
-        overall_risk = contract_risk(analysed)
-        ctype = classify_contract(text)
+    file_content = uploaded_file.getvalue()
+    cache = get_cache()
+    key = upload_key(file_content, uploaded_file.name)
+    result = cache.get(key)
+    if result is None:
+        live = st.empty()
+        with live.container():
+            st.caption("🔍 Analyzing contract... clauses appear as they are parsed.")
+            progress = st.empty()
+            streamed = 0
+            for kind, payload in stream_contract(file_content, uploaded_file.name, os.cpu_count() or 1, trace_memory,
+                                                 get_templates(), keep_text=True):
+                if kind == "clause":
+                    streamed += 1
+                    if streamed <= CLAUSES_PER_PAGE:
+                        render_clause(streamed, payload)
+                    else:
+                        progress.caption(f"{streamed} clauses analyzed so far...")
+                else:
+                    result = payload
+        live.empty()
+        # The text is only kept long enough to index this upload, not cached with its analysis.
+        full_text = result.pop("text")
+        cache.put(key, result)
+        if result["clauses"]:
+            get_clause_index().add(result["text_hash"], uploaded_file.name, full_text, result["clauses"])
+        get_text_index().add(result["text_hash"], uploaded_file.name, result["type"], result["risk"], full_text)
     
-    tab1, tab2, tab3 = st.tabs(["📘 Summary", "⚠️ Clause Analysis", "📄 PDF Export"])
+    parties = result["parties"]
+    amounts = result["amounts"]
+    jurisdiction = result["jurisdiction"]
+    analysed = result["clauses"]
+    overall_risk = result["risk"]
+    ctype = result["type"]
+    
+    tab1, tab2, tab3, tab4 = st.tabs(["📘 Summary", "⚠️ Clause Analysis", "📄 PDF Export", "🔎 Similar Clauses"])
     
     with tab1:
         col1, col2 = st.columns(2)
         col1.metric("Contract Type", ctype)
+        col1.caption(" · ".join(f"{name.title()} {p:.0%}" for name, p in
+                                sorted(result["type_confidence"].items(), key=lambda item: -item[1])))
         col2.metric("Overall Risk", overall_risk)
+        template = result["template"]
+        if template:
+            changes = clause_changes(template, analysed)
+            raised = sum(1 for _, _, delta in changes if delta and delta > 0)
+            lowered = sum(1 for _, _, delta in changes if delta and delta < 0)
+            st.info(f"📑 Version {template['version']}, compared with **{template['name']}** "
+                    f"({template['similarity']:.0%} similar): {template['clauses'].count('modified')} modified, "
+                    f"{template['clauses'].count('new')} new, {len(template['removed'])} removed clauses; "
+                    f"risk raised in {raised} and lowered in {lowered}. "
+                    f"{template['reused_clauses']} clause signatures reused.")
         
         st.subheader("👥 Parties")
         st.json(parties)
@@ -220,34 +192,96 @@ if uploaded_file is not None:
     
     with tab2:
         st.subheader("Detailed Clause Analysis")
-        for i, c in enumerate(analysed, 1):
-            with st.expander(f"Clause {i} | Risk: {c['risk']} ({len(c['reasons'])} issues)"):
-                st.write(c["text"])
-                st.info(c["explanation"])
-                if c["reasons"]:
-                    st.warning(f"Risk factors: {', '.join(c['reasons'])}")
-                if c["suggestion"]:
-                    st.success(f"💡 Fix: {c['suggestion']}")
+        counts = {level: sum(c["risk"] == level for c in analysed) for level in ("HIGH", "MEDIUM", "LOW")}
+        st.caption(f"{len(analysed)} clauses: {counts['HIGH']} high, {counts['MEDIUM']} medium, {counts['LOW']} low risk")
+        pages = max(1, -(-len(analysed) // CLAUSES_PER_PAGE))
+        page = st.number_input("Page", min_value=1, max_value=pages, value=1, key=f"clause_page_{key}") if pages > 1 else 1
+        show_source = st.toggle("📍 Show clauses in the source document", key=f"show_source_{key}")
+        text = get_document_text(key, file_content, uploaded_file.name) if show_source else None
+        first = (page - 1) * CLAUSES_PER_PAGE
+        changes = clause_changes(template, analysed) if template else [None] * len(analysed)
+        if template and (template["removed"] or any(status != "unchanged" for status, _, _ in changes)):
+            with st.expander(f"🔀 Changes since {template['name']}"):
+                st.table([{"clause": str(i), "change": label, "risk": c["risk"], "delta": f"{delta:+d}" if delta else ""}
+                          for i, ((status, label, delta), c) in enumerate(zip(changes, analysed), 1) if status != "unchanged"]
+                         + [{"clause": f"{r['position'] + 1} (old)", "change": "Removed", "risk": r["risk"], "delta": ""}
+                            for r in template["removed"]])
+        for i, c in enumerate(analysed[first:first + CLAUSES_PER_PAGE], first + 1):
+            render_clause(i, c, text, changes[i - 1])
     
     with tab3:
-        pdf = generate_pdf({
-            "type": ctype, "risk": overall_risk, "parties": parties,
-            "amounts": amounts, "jurisdiction": str(jurisdiction), "clauses": analysed
-        })
-        st.download_button(
-            "📥 Download Detailed PDF Report", pdf, "contract_analysis.pdf", "application/pdf"
-        )
-        st.info("✅ Professional PDF ready for lawyer consultation!")
+        renderer = get_report_renderer()
+        renderer.trace_memory = trace_memory
+        data = report_data(result)
+        if prerender_reports:
+            renderer.prerender(key, data)
+        report_path = renderer.cached(key)
+        if report_path is None and st.button("🛠️ Prepare PDF Report", key=f"prepare_report_{key}"):
+            with st.spinner("Rendering PDF report..."):
+                report_path = renderer.render(key, data)
+        if report_path is not None:
+            with open(report_path, "rb") as pdf:
+                st.download_button(
+                    "📥 Download Detailed PDF Report", pdf, "contract_analysis.pdf", "application/pdf"
+                )
+            st.info("✅ Professional PDF ready for lawyer consultation!")
+    
+    with tab4:
+        clause_index = get_clause_index()
+        st.caption(f"Searching {len(clause_index):,} clauses from every analyzed contract.")
+        options = [f"Clause {i}: {c['text'][:80]}" for i, c in enumerate(analysed, 1)]
+        picked = st.selectbox("Find clauses like", options, key=f"similar_clause_{key}") if options else None
+        query = st.text_area("...or paste clause text", key=f"similar_text_{key}")
+        if query.strip() or picked:
+            if query.strip():
+                text = query
+            else:
+                # The analysis keeps only a short display copy; search with the whole clause.
+                c = analysed[options.index(picked)]
+                span = c.get("span")
+                text = (get_document_text(key, file_content, uploaded_file.name)[span["start"]:span["end"]]
+                        if span else c["text"])
+            hits = clause_index.search(text, SIMILAR_CLAUSES, exclude=None if query.strip() else result["text_hash"])
+            for hit in hits:
+                with st.expander(f"{hit['score']:.0%} | {hit['name']} · clause {hit['position'] + 1} | Risk: {hit['risk']}"):
+                    st.write(hit["text"])
+            if not hits:
+                st.info("No similar clauses indexed yet.")
     
-    audit = {"hash": hashlib.sha256(text.encode()).hexdigest(), "time": datetime.now().isoformat(),
-             "type": ctype, "risk": overall_risk, "parties": parties}
-    try:
-        with open("audit_log.json", "a") as f:
-            f.write(json.dumps(audit) + "\n")
-    except:
-        pass
-
-else:
+    with st.sidebar.expander("Pipeline stage timings"):
+        stages = {**result.get("stages", {}), **get_report_renderer().stages.get(key, {})}
+        st.table([{"stage": name, "calls": stat["calls"], "ms": round(stat["seconds"] * 1e3, 2),
+                   **({"peak KiB": stat["peak_kb"]} if "peak_kb" in stat else {})}
+                  for name, stat in stages.items()])
+        st.caption("Recorded when this contract was first analyzed; cached results keep their original timings.")
+    
+    with st.sidebar.expander("Regex pattern stats"):
+        st.table([{"pattern": name, "calls": stat["calls"], "hits": stat["hits"], "ms": round(stat["seconds"] * 1e3, 2)}
+                  for name, stat in PATTERNS.stats().items()])
+    
+    audit_log = get_audit_log()
+    audit_log.write(audit_record(result))
+    if audit_log.dropped:
+        st.sidebar.warning(f"{audit_log.dropped} audit records could not be written ({audit_log.last_error or 'queue full'})")
+
+with st.sidebar.expander("🔍 Search all contracts"):
+    search_query = st.text_input("Words, \"exact phrases\", OR, -exclude", key="text_search")
+    search_type = st.selectbox("Type", ["Any"] + [ctype for ctype, _ in CONTRACT_KEYWORDS] + ["GENERAL"], key="text_search_type")
+    search_risk = st.selectbox("Risk", ["Any", "HIGH", "MEDIUM", "LOW"], key="text_search_risk")
+    if search_query.strip():
+        try:
+            total, hits = get_text_index().search(search_query, None if search_type == "Any" else search_type,
+                                                  None if search_risk == "Any" else search_risk, TEXT_SEARCH_RESULTS)
+        except ValueError as e:
+            st.error(str(e))
+        else:
+            pending = get_text_index().pending
+            st.caption(f"{total} matching contracts, newest first"
+                       + (f"; {pending} recent uploads are searchable within {TEXT_INDEX_FLUSH_SECONDS} s" if pending else ""))
+            for hit in hits:
+                st.write(f"**{hit['name']}** · {hit['type']} · {hit['risk']} risk")
+
+if uploaded_file is None:
     st.info("👆 Upload a contract in the sidebar to begin analysis!")
     st.balloons()
 
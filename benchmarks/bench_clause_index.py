@@ -0,0 +1,97 @@
+"""Build and query throughput of the clause similarity index at corpus scale.
+
+Synthetic contracts (--per-contract clauses each) are vectorized and
+appended until the index holds --clauses clauses, then --queries clause
+queries are timed against it. BLAS is limited to one thread so the numbers
+are single-CPU; the vector file is in the page cache after the build, so
+cold-disk queries are slower by the time to read it once. Results are stored
+under --label in benchmarks/clause_index_results.json.
+
+Run from the repository root: python benchmarks/bench_clause_index.py --label after
+"""
+import os
+
+for _var in ("OPENBLAS_NUM_THREADS", "OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+    os.environ.setdefault(_var, "1")
+
+import argparse
+import hashlib
+import json
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, ".")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from contractai.clause_index import ClauseIndex, clause_vectors
+from contractai.pipeline import extract_clauses
+from synth import KINDS, RISKY_CLAUSES, generate_contract
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--label", default="current")
+    parser.add_argument("--clauses", type=int, default=1_000_000, help="clauses in the index")
+    parser.add_argument("--per-contract", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--output", default=os.path.join("benchmarks", "clause_index_results.json"))
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="clause-index-")
+    try:
+        index = ClauseIndex(root)
+        vectorize = append = 0.0
+        seed = 0
+        while len(index) < args.clauses:
+            text = generate_contract(KINDS[seed % len(KINDS)], args.per_contract, seed)["text"]
+            clauses = extract_clauses(text)[:args.clauses - len(index)]
+            start = time.perf_counter()
+            vectors = clause_vectors(clauses)
+            vectorize += time.perf_counter() - start
+            start = time.perf_counter()
+            index.append(hashlib.sha256(text.encode()).hexdigest(), f"synthetic-{seed}", vectors,
+                         [(i, "LOW", "", clause[:300]) for i, clause in enumerate(clauses)])
+            append += time.perf_counter() - start
+            seed += 1
+        total = len(index)
+
+        rng = random.Random(0)
+        queries = [rng.choice(RISKY_CLAUSES).format(first="client", second="vendor") for _ in range(args.queries)]
+        index.search(queries[0], args.k)  # map the file
+        times = []
+        for query in queries:
+            start = time.perf_counter()
+            index.search(query, args.k)
+            times.append(time.perf_counter() - start)
+        index.close()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    results = {
+        "clauses": total, "vectorize_clauses_per_s": round(total / vectorize, 1),
+        "append_clauses_per_s": round(total / append, 1),
+        "query_median_ms": round(statistics.median(times) * 1e3, 2),
+        "query_max_ms": round(max(times) * 1e3, 2),
+    }
+    print(f"{total:,} clauses: vectorize {total / vectorize:,.0f}/s, append {total / append:,.0f}/s; "
+          f"top-{args.k} query median {results['query_median_ms']} ms, max {results['query_max_ms']} ms")
+
+    history = {}
+    if os.path.exists(args.output):
+        with open(args.output, encoding="utf-8") as f:
+            history = json.load(f)
+    history[args.label] = {"per_contract": args.per_contract, "k": args.k, "python": platform.python_version(),
+                           "results": results}
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=2)
+        f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
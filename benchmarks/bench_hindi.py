@@ -0,0 +1,77 @@
+"""normalize_hindi on a synthetic 200-page Devanagari contract: the old
+per-term str.replace loop vs. the single-pass trie regex, at the shipped
+dictionary size and at a few thousand terms.
+
+Run from the repository root: python benchmarks/bench_hindi.py
+"""
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, ".")
+
+from contractai.hindi import HINDI_TERMS, trie_pattern
+
+PAGES = 200
+CHARS_PER_PAGE = 3000
+FILLER = "यह अनुबंध पक्षों के बीच दिनांक को किया गया है और सभी शर्तें लागू होंगी".split()
+
+
+def synthetic_terms(n, rng):
+    letters = [chr(c) for c in range(0x0915, 0x0939)]
+    terms = dict(HINDI_TERMS)
+    while len(terms) < n:
+        terms["".join(rng.choice(letters) for _ in range(rng.randint(3, 8)))] = f"term{len(terms)}"
+    return terms
+
+
+def make_contract(terms, rng):
+    vocab = list(terms) + FILLER * 4
+    pages = []
+    for _ in range(PAGES):
+        words, size = [], 0
+        while size < CHARS_PER_PAGE:
+            word = rng.choice(vocab)
+            words.append(word)
+            size += len(word) + 1
+        pages.append(" ".join(words))
+    return "\n".join(pages)
+
+
+def replace_loop(text, terms):
+    for hi, en in terms.items():
+        text = text.replace(hi, en)
+    return text
+
+
+def single_pass(text, pattern, terms):
+    return pattern.sub(lambda m: terms[m.group()], text)
+
+
+def best_of(fn, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    rng = random.Random(7)
+    print(f"{PAGES} pages x ~{CHARS_PER_PAGE} chars")
+    print(f"{'terms':>6} {'replace loop ms':>16} {'single pass ms':>15} {'compile ms':>11}")
+    for n in (len(HINDI_TERMS), 1000, 5000):
+        terms = synthetic_terms(n, rng)
+        text = make_contract(terms, rng)
+        start = time.perf_counter()
+        pattern = re.compile(trie_pattern(terms))
+        compile_ms = (time.perf_counter() - start) * 1e3
+        t_loop = best_of(replace_loop, text, terms)
+        t_pass = best_of(single_pass, text, pattern, terms)
+        print(f"{n:>6} {t_loop * 1e3:>16.1f} {t_pass * 1e3:>15.1f} {compile_ms:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
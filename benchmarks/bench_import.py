@@ -0,0 +1,63 @@
+"""Cold-start cost of the Streamlit script and the analysis package.
+
+Each measurement runs in a fresh interpreter: the wall time to execute the
+target, and which heavy optional dependencies it pulled in. Results are
+appended under --label to benchmarks/import_times.json so runs from different
+commits can be compared.
+
+Run from the repository root: python benchmarks/bench_import.py --label after
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HEAVY = ["pymupdf", "docx", "reportlab", "numpy"]
+TARGETS = {
+    "contractai.pipeline": "import contractai.pipeline",
+    "app.py (no upload)": "import runpy; runpy.run_path('app.py')",
+}
+PROBE = """
+import sys, time
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+print(repr((elapsed, [m for m in {heavy!r} if m in sys.modules])))
+"""
+
+
+def measure(code, repeat):
+    times, loaded = [], []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", PROBE.format(code=code, heavy=HEAVY)],
+                             capture_output=True, text=True, check=True, cwd=".").stdout
+        elapsed, loaded = eval(out.strip().splitlines()[-1])
+        times.append(elapsed)
+    return {"median_ms": round(statistics.median(times) * 1e3, 1), "heavy_modules": loaded}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--label", default="current")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default=os.path.join("benchmarks", "import_times.json"))
+    args = parser.parse_args()
+
+    results = {name: measure(code, args.repeat) for name, code in TARGETS.items()}
+    for name, r in results.items():
+        print(f"{name:24} {r['median_ms']:>8.1f} ms  loads: {', '.join(r['heavy_modules']) or '-'}")
+
+    history = {}
+    if os.path.exists(args.output):
+        with open(args.output, encoding="utf-8") as f:
+            history = json.load(f)
+    history[args.label] = results
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=2)
+        f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Throughput of the per-term substring loop vs. both TermMatcher strategies.
+
+The str.find scan and the automaton report the same hits; TermMatcher picks
+the automaton from AUTOMATON_MIN_TERMS terms, about where it overtakes the
+scan below.
+
+Run from the repository root: python benchmarks/bench_matcher.py
+"""
+import random
+import sys
+import time
+
+sys.path.insert(0, ".")
+
+from contractai.matcher import AUTOMATON_MIN_TERMS, TermMatcher
+
+WORDS = ("notice party tenant landlord employer employee salary rent deposit term "
+         "agreement liability indemnity breach court arbitration clause payment "
+         "schedule premises confidential period months years written consent").split()
+
+
+def make_rules(n, rng):
+    rules = set()
+    while len(rules) < n:
+        rules.add(" ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 3))) + rng.choice(["", "s", "ed"]))
+    return sorted(rules)
+
+
+def make_clauses(count, rng):
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 120))) for _ in range(count)]
+
+
+def naive(rules, clauses):
+    return sum(sum(term in text for term in rules) for text in clauses)
+
+
+def matched(matcher, clauses):
+    return sum(len({term for _, _, term in matcher.find(text)}) for text in clauses)
+
+
+def bench(fn, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    rng = random.Random(42)
+    clauses = make_clauses(500, rng)
+    mb = sum(len(c) for c in clauses) / 1e6
+    print(f"{len(clauses)} clauses, {mb:.2f} MB of text")
+    print(f"{'rules':>6} {'naive MB/s':>11} {'str.find MB/s':>14} {'automaton MB/s':>15} {'build ms':>9}")
+    for n in (10, 30, 100, 300, 1000):
+        rules = make_rules(n, rng)
+        start = time.perf_counter()
+        matcher = TermMatcher(rules, automaton=True)
+        build = time.perf_counter() - start
+        t_naive, hits_naive = bench(naive, rules, clauses)
+        t_find, hits_find = bench(matched, TermMatcher(rules, automaton=False), clauses)
+        t_auto, hits_auto = bench(matched, matcher, clauses)
+        assert hits_naive == hits_find == hits_auto, (hits_naive, hits_find, hits_auto)
+        print(f"{n:>6} {mb / t_naive:>11.2f} {mb / t_find:>14.2f} {mb / t_auto:>15.2f} {build * 1e3:>9.1f}")
+    print(f"TermMatcher uses the automaton from {AUTOMATON_MIN_TERMS} terms")
+
+
+if __name__ == "__main__":
+    main()
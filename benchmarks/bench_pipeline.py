@@ -0,0 +1,92 @@
+"""Throughput and peak memory of each pipeline function on synthetic contracts.
+
+One contract of each kind (employment, lease, partnership, service) is
+generated with --clauses clauses and rendered as TXT, DOCX and PDF. Each
+function is timed over the whole set (median of --repeat runs), then run once
+more under tracemalloc for its peak Python-heap allocation; memory held by
+PyMuPDF's C library is not visible to tracemalloc. Results are stored under
+--label in benchmarks/pipeline_results.json so runs from different commits
+can be compared.
+
+Run from the repository root: python benchmarks/bench_pipeline.py --label after
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from io import BytesIO
+
+sys.path.insert(0, ".")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from contractai import analyze_clause, analyze_contract, extract_clauses, extract_text, generate_pdf, report_data
+from synth import KINDS, generate_contract, to_docx, to_pdf
+
+
+def measure(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(times), peak
+
+
+def cases(contracts):
+    docs = {
+        "txt": [c["text"].encode("utf-8") for c in contracts],
+        "docx": [to_docx(c["text"]) for c in contracts],
+        "pdf": [to_pdf(c["text"]) for c in contracts],
+    }
+    texts = [c["text"] for c in contracts]
+    clauses = [clause for text in texts for clause in extract_clauses(text)]
+    reports = [report_data(analyze_contract(data, "contract.txt")) for data in docs["txt"]]
+    chars = sum(len(t) for t in texts)
+
+    for fmt, blobs in docs.items():
+        yield (f"extract_text[{fmt}]", lambda blobs=blobs, fmt=fmt: [extract_text(BytesIO(b), f"c.{fmt}") for b in blobs],
+               sum(len(b) for b in blobs), "bytes")
+    yield "extract_clauses", lambda: [extract_clauses(t) for t in texts], chars, "chars"
+    yield "analyze_clause", lambda: [analyze_clause(c) for c in clauses], len(clauses), "clauses"
+    yield "analyze_contract[txt]", lambda: [analyze_contract(b, "c.txt") for b in docs["txt"]], len(texts), "contracts"
+    yield "generate_pdf", lambda: [generate_pdf(r) for r in reports], sum(len(r["clauses"]) for r in reports), "clauses"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--label", default="current")
+    parser.add_argument("--clauses", type=int, default=200, help="clauses per synthetic contract")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default=os.path.join("benchmarks", "pipeline_results.json"))
+    args = parser.parse_args()
+
+    contracts = [generate_contract(kind, args.clauses, args.seed) for kind in KINDS]
+    results = {}
+    for name, fn, units, unit in cases(contracts):
+        seconds, peak = measure(fn, args.repeat)
+        results[name] = {"median_ms": round(seconds * 1e3, 2), f"{unit}_per_s": round(units / seconds, 1),
+                         "peak_kb": round(peak / 1024, 1)}
+        print(f"{name:24} {seconds * 1e3:>9.2f} ms {units / seconds:>14,.0f} {unit}/s {peak / 1024:>10.1f} KiB peak")
+
+    history = {}
+    if os.path.exists(args.output):
+        with open(args.output, encoding="utf-8") as f:
+            history = json.load(f)
+    history[args.label] = {"clauses": args.clauses, "seed": args.seed, "python": platform.python_version(),
+                           "results": results}
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=2)
+        f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
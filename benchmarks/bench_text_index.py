@@ -0,0 +1,103 @@
+"""Indexing and query throughput of the full-text index at nightly-batch scale.
+
+--docs synthetic contracts (--clauses clauses each) are tokenized with
+document_tokens, as batch workers do, and added to a TextIndex in one
+process, as the batch parent does; segment writes and merges are included
+in the add time. Then a set of term, phrase and boolean queries is timed.
+Results are stored under --label in benchmarks/text_index_results.json.
+
+Run from the repository root: python benchmarks/bench_text_index.py --label after
+"""
+import argparse
+import hashlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, ".")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from contractai.text_index import TextIndex, document_tokens
+from synth import KINDS, generate_contract
+
+QUERIES = [
+    "indemnity",
+    '"sole arbitrator"',
+    '"unlimited indemnity" -arbitration',
+    '"security deposit" AND (tenant OR landlord)',
+    "NOT vendor",
+    '"shall be reviewed every quarter"',
+]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--label", default="current")
+    parser.add_argument("--docs", type=int, default=100_000)
+    parser.add_argument("--clauses", type=int, default=40, help="clauses per synthetic contract")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default=os.path.join("benchmarks", "text_index_results.json"))
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="text-index-")
+    try:
+        index = TextIndex(root)
+        tokenize = add = 0.0
+        tokens = 0
+        for n in range(args.docs):
+            kind = KINDS[n % len(KINDS)]
+            text = generate_contract(kind, args.clauses, n)["text"]
+            start = time.perf_counter()
+            terms, ids = document_tokens(text)
+            tokenize += time.perf_counter() - start
+            start = time.perf_counter()
+            index.add_tokens(hashlib.sha256(text.encode()).hexdigest(), f"synthetic-{n}", kind,
+                             "HIGH" if n % 3 else "LOW", terms, ids)
+            add += time.perf_counter() - start
+            tokens += len(ids)
+        start = time.perf_counter()
+        index.flush()
+        add += time.perf_counter() - start
+        size = sum(os.path.getsize(os.path.join(root, f)) for f in os.listdir(root))
+
+        queries = {}
+        for query in QUERIES:
+            times = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                total, _ = index.search(query, limit=100)
+                times.append(time.perf_counter() - start)
+            queries[query] = {"median_ms": round(statistics.median(times) * 1e3, 2), "matches": total}
+            print(f"{query:44} {statistics.median(times) * 1e3:>9.2f} ms {total:>9,} matches")
+        start = time.perf_counter()
+        index.search('"unlimited indemnity"', type="SERVICE", risk="HIGH")
+        filtered = time.perf_counter() - start
+        index.close()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    results = {
+        "docs": args.docs, "tokens": tokens, "index_mb": round(size / 2 ** 20, 1),
+        "tokenize_docs_per_s": round(args.docs / tokenize, 1), "add_docs_per_s": round(args.docs / add, 1),
+        "filtered_phrase_ms": round(filtered * 1e3, 2), "queries": queries,
+    }
+    print(f"{args.docs:,} docs, {tokens:,} tokens, {results['index_mb']} MB: tokenize {args.docs / tokenize:,.0f} docs/s "
+          f"(per batch worker), add+flush {args.docs / add:,.0f} docs/s; filtered phrase {filtered * 1e3:.1f} ms")
+
+    history = {}
+    if os.path.exists(args.output):
+        with open(args.output, encoding="utf-8") as f:
+            history = json.load(f)
+    history[args.label] = {"clauses": args.clauses, "python": platform.python_version(), "results": results}
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=2)
+        f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Deterministic synthetic Indian contracts for benchmarks.
+
+generate_contract(kind, clauses, seed) returns the contract text together
+with what it is known to contain (parties, INR amounts, jurisdiction and the
+numbers of the risky clauses), so the same seed always yields the same
+document. to_docx / to_pdf render that text in the other supported formats.
+
+Run as a script to write a labelled corpus for the contract classifier:
+python benchmarks/synth.py corpus/ && python -m contractai train-classifier corpus/
+"""
+import argparse
+import os
+import random
+import textwrap
+from io import BytesIO
+
+KINDS = ("EMPLOYMENT", "LEASE", "PARTNERSHIP", "SERVICE")
+
+COMPANIES = ["Acme Pvt Ltd", "Sahyadri Textiles Pvt Ltd", "Ganga Logistics LLP", "Nilgiri Foods Pvt Ltd",
+             "Deccan Software Services Ltd", "Coromandel Traders", "Aravali Infra Pvt Ltd", "Konkan Exports"]
+PEOPLE = ["Ravi Kumar", "Priya Sharma", "Arjun Mehta", "Lakshmi Iyer", "Imran Qureshi", "Neha Gupta",
+          "Suresh Reddy", "Anjali Nair", "Harpreet Singh", "Meera Joshi"]
+CITIES = ["Mumbai", "Bengaluru", "Chennai", "New Delhi", "Hyderabad", "Pune", "Kolkata", "Ahmedabad"]
+
+TITLES = {
+    "EMPLOYMENT": "EMPLOYMENT AGREEMENT",
+    "LEASE": "LEASE DEED",
+    "PARTNERSHIP": "PARTNERSHIP DEED",
+    "SERVICE": "MASTER SERVICE AGREEMENT",
+}
+AMOUNT_CLAUSES = {
+    "EMPLOYMENT": ["The employee shall receive a salary of {amount} per month, payable on the last working day.",
+                   "A joining bonus and security deposit of {amount} shall be paid within thirty days."],
+    "LEASE": ["The tenant shall pay a monthly rent of {amount} on or before the fifth day of each month.",
+              "The tenant shall keep a refundable security deposit of {amount} with the landlord."],
+    "PARTNERSHIP": ["Each partner shall contribute capital by a payment of {amount} to the firm account.",
+                    "Drawings by any partner shall not exceed an amount of {amount} in a financial year."],
+    "SERVICE": ["The client shall make a payment of {amount} for each completed service milestone.",
+                "The vendor shall raise monthly invoices not exceeding {amount} plus applicable GST."],
+}
+FILLER_CLAUSES = {
+    "EMPLOYMENT": ["The employee shall devote full working time to the duties assigned by the employer.",
+                   "Leave shall be granted as per the leave policy of the employer in force from time to time.",
+                   "The employee shall comply with all lawful instructions and policies of the company."],
+    "LEASE": ["The tenant shall use the premises for residential purposes only and not sublet them.",
+              "Minor repairs shall be borne by the tenant and structural repairs by the landlord.",
+              "The landlord may inspect the premises with reasonable prior notice to the tenant."],
+    "PARTNERSHIP": ["Profits and losses of the firm shall be shared equally between the partners.",
+                    "Proper books of account shall be kept at the principal place of business of the partnership.",
+                    "No partner shall stand surety for any person without the consent of the other partners."],
+    "SERVICE": ["The vendor shall perform the services with due care and in a professional manner.",
+                "Service levels shall be reviewed every quarter by both parties in good faith.",
+                "The vendor shall maintain adequate staff to deliver the services described in the schedule."],
+}
+RISKY_CLAUSES = [
+    "The {first} may terminate immediate and without notice at its sole discretion.",
+    "The {second} agrees to a non compete for two years after this agreement ends.",
+    "All confidentiality obligations are perpetual and survive termination of this agreement.",
+    "The {second} shall provide unlimited indemnity for all losses suffered by the {first}.",
+    "Any dispute shall be referred to arbitration by a sole arbitrator appointed by the {first}.",
+]
+ROLES = {
+    "EMPLOYMENT": ("employer", "employee"),
+    "LEASE": ("landlord", "tenant"),
+    "PARTNERSHIP": ("first partner", "second partner"),
+    "SERVICE": ("client", "vendor"),
+}
+
+
+def _amount(rng):
+    # Rs./INR only: the rupee sign is missing from the base PDF fonts used by to_pdf.
+    lakhs, thousands = rng.randint(0, 99), rng.randint(1, 99)
+    digits = f"{lakhs},{thousands:02d},000" if lakhs else f"{thousands},000"
+    return f"{rng.choice(['Rs.', 'INR'])} {digits}"
+
+
+def generate_contract(kind, clauses=40, seed=0):
+    """A ``kind`` contract with ``clauses`` numbered clauses, plus its ground truth."""
+    rng = random.Random(f"{kind}-{clauses}-{seed}")
+    first, second = ROLES[kind]
+    city = rng.choice(CITIES)
+    if kind == "LEASE":
+        parties = {"Landlord": rng.choice(PEOPLE), "Tenant": rng.choice(PEOPLE)}
+        header = f"Landlord: {parties['Landlord']}\nTenant: {parties['Tenant']}"
+    else:
+        left = rng.choice(COMPANIES)
+        right = rng.choice(PEOPLE if kind == "EMPLOYMENT" else COMPANIES)
+        parties = {"Party 1": left, "Party 2": right}
+        header = f"This agreement is made BETWEEN {left} AND {right} ({second.title()})"
+
+    body, amounts, risky = [], [], []
+    for i in range(max(clauses - 1, 1)):
+        roll = rng.random()
+        if roll < 0.15:
+            amount = _amount(rng)
+            amounts.append(amount)
+            body.append(rng.choice(AMOUNT_CLAUSES[kind]).format(amount=amount))
+        elif roll < 0.3:
+            risky.append(i + 1)
+            body.append(rng.choice(RISKY_CLAUSES).format(first=first, second=second))
+        else:
+            body.append(rng.choice(FILLER_CLAUSES[kind]))
+    body.append(f"This agreement is governed by the laws of India, and the courts at {city} shall have "
+                f"exclusive jurisdiction.")
+
+    text = f"{TITLES[kind]}\n{header}\n\n" + "\n".join(f"{n}. {clause}" for n, clause in enumerate(body, 1))
+    return {
+        "kind": kind, "text": text, "parties": parties, "amounts": amounts,
+        "jurisdiction": {"Governing Law": "India", "Jurisdiction": city}, "risky_clauses": risky,
+    }
+
+
+def to_docx(text):
+    from docx import Document
+    doc = Document()
+    for line in text.split("\n"):
+        doc.add_paragraph(line)
+    out = BytesIO()
+    doc.save(out)
+    return out.getvalue()
+
+
+def to_pdf(text, lines_per_page=55, width=95):
+    import pymupdf as fitz
+    lines = [wrapped for line in text.split("\n") for wrapped in (textwrap.wrap(line, width) or [""])]
+    doc = fitz.open()
+    for start in range(0, len(lines), lines_per_page):
+        page = doc.new_page()
+        page.insert_text((50, 60), "\n".join(lines[start:start + lines_per_page]), fontsize=9)
+    return doc.tobytes()
+
+
+def write_corpus(root, per_kind=60, seed=0, formats=("txt", "docx", "pdf")):
+    """<root>/<KIND>/<n>.<fmt> contracts of varied length.
+
+    Each contract also borrows a few clauses from other kinds, so a lease
+    that mentions an employee is still labelled LEASE.
+    """
+    rng = random.Random(seed)
+    for kind in KINDS:
+        os.makedirs(os.path.join(root, kind), exist_ok=True)
+        others = [c for other in KINDS if other != kind for c in FILLER_CLAUSES[other] + AMOUNT_CLAUSES[other]]
+        for n in range(per_kind):
+            text = generate_contract(kind, rng.randint(5, 120), seed * 100000 + n)["text"]
+            lines = text.split("\n")
+            for _ in range(rng.randint(0, 3)):
+                lines.insert(rng.randint(3, len(lines)), "Note: " + rng.choice(others).format(amount="Rs. 10,000"))
+            text = "\n".join(lines)
+            fmt = formats[n % len(formats)]
+            data = text.encode("utf-8") if fmt == "txt" else to_docx(text) if fmt == "docx" else to_pdf(text)
+            with open(os.path.join(root, kind, f"{n:04d}.{fmt}"), "wb") as f:
+                f.write(data)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("root")
+    parser.add_argument("--per-kind", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    write_corpus(args.root, args.per_kind, args.seed)
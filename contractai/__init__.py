@@ -0,0 +1,27 @@
+"""ContractAI analysis engine: extraction, clause risk analysis and reporting,
+importable without Streamlit."""
+from contractai.amounts import extract_amount_records, parse_amount
+from contractai.clause_index import ClauseIndex, clause_vectors
+from contractai.hindi import normalize_hindi
+from contractai.pipeline import (
+    RISK_RULES, analysis_version, analyze_clause, analyze_contract, classify_contract, contract_risk,
+    document_text, extract_amounts, extract_clauses, extract_jurisdiction, extract_parties, extract_text,
+    index_clauses, iter_clause_spans, iter_clauses, iter_text, stream_contract,
+)
+from contractai.report import generate_pdf, report_data
+from contractai.templates import TemplateIndex, align_clauses, match_template
+from contractai.text_index import TextIndex, document_tokens
+from contractai.types import (
+    AmountRecord, Analysis, ClauseAnalysis, ClauseSpan, RemovedClause, ReportData, RuleMatch, StageStats,
+    TemplateMatch,
+)
+
+__all__ = [
+    "RISK_RULES", "align_clauses", "analysis_version", "analyze_clause", "analyze_contract", "classify_contract",
+    "clause_vectors", "contract_risk", "document_text", "document_tokens", "extract_amount_records", "extract_amounts", "extract_clauses",
+    "extract_jurisdiction", "extract_parties", "extract_text", "generate_pdf", "index_clauses",
+    "iter_clause_spans", "iter_clauses", "iter_text", "match_template", "normalize_hindi", "parse_amount",
+    "report_data", "stream_contract",
+    "AmountRecord", "Analysis", "ClauseAnalysis", "ClauseIndex", "ClauseSpan", "RemovedClause", "ReportData", "RuleMatch",
+    "StageStats", "TemplateIndex", "TemplateMatch", "TextIndex",
+]
@@ -0,0 +1,134 @@
+import argparse
+import sys
+
+from contractai.batch import batch_main
+
+
+def amounts_main(args):
+    from contractai.portfolio import amounts_main
+    return amounts_main(args)
+
+
+def audit_main(args):
+    from contractai.audit_store import audit_main
+    return audit_main(args)
+
+
+def train_main(args):
+    from contractai.classifier import train_main
+    return train_main(args)
+
+
+def classify_main(args):
+    from contractai.classifier import classify_main
+    return classify_main(args)
+
+
+def index_main(args):
+    from contractai.clause_index import index_main
+    return index_main(args)
+
+
+def search_main(args):
+    from contractai.clause_index import search_main
+    return search_main(args)
+
+
+def search_text_main(args):
+    from contractai.text_index import search_main
+    return search_main(args)
+
+
+def serve_main(args):
+    from contractai.service import serve_main
+    return serve_main(args)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="contractai")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    batch = sub.add_parser("batch", help="analyze every PDF/DOCX/TXT contract under a directory")
+    batch.add_argument("directory")
+    batch.add_argument("-o", "--output", help="write JSON lines here instead of stdout")
+    batch.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    batch.add_argument("--pattern-stats", action="store_true", help="print per-regex call/hit counts and timing to stderr")
+    batch.add_argument("--stage-stats", action="store_true", help="print total time per pipeline stage to stderr")
+    batch.add_argument("--trace-memory", action="store_true", help="record tracemalloc peaks per stage (slower)")
+    batch.add_argument("--templates", metavar="DB", help="match and index contracts in this SQLite template index")
+    batch.add_argument("--text-index", metavar="DIR", help="add the normalized text to this full-text index")
+    batch.set_defaults(func=batch_main)
+
+    amounts = sub.add_parser("amounts", help="portfolio totals and outliers over batch JSON lines")
+    amounts.add_argument("results", help="JSON lines written by 'batch', or - for stdin")
+    amounts.add_argument("--fence", type=float, default=3.0, help="outlier fence in IQRs of log10(amount)")
+    amounts.set_defaults(func=amounts_main)
+
+    audit = sub.add_parser("audit", help="import and query the indexed audit store")
+    audit.add_argument("--db", default="audit.db", help="SQLite audit store (default: audit.db)")
+    audit_sub = audit.add_subparsers(dest="audit_command", required=True)
+    audit_import = audit_sub.add_parser("import", help="one-time import of JSONL audit logs and their rotated backups")
+    audit_import.add_argument("logs", nargs="+")
+    audit_query = audit_sub.add_parser("query", help="print matching audit records as JSON lines, newest first")
+    audit_query.add_argument("--hash")
+    audit_query.add_argument("--type", type=str.upper)
+    audit_query.add_argument("--risk", type=str.upper)
+    audit_query.add_argument("--since", help="ISO date/time, inclusive")
+    audit_query.add_argument("--until", help="ISO date/time, exclusive")
+    audit_query.add_argument("--limit", type=int, default=1000)
+    audit.set_defaults(func=audit_main)
+
+    train = sub.add_parser("train-classifier", help="train the TF-IDF contract type classifier")
+    train.add_argument("corpus", help="directory laid out as <corpus>/<TYPE>/<contract files>")
+    train.add_argument("-o", "--output", default="classifier.npz", help="model file (default: classifier.npz)")
+    train.add_argument("-j", "--workers", type=int, default=None, help="extraction processes (default: all cores)")
+    train.add_argument("--epochs", type=int, default=1000)
+    train.set_defaults(func=train_main)
+
+    classify = sub.add_parser("classify", help="classify every contract under a directory, in batches")
+    classify.add_argument("directory")
+    classify.add_argument("-o", "--output", help="write JSON lines here instead of stdout")
+    classify.add_argument("-j", "--workers", type=int, default=None, help="extraction processes (default: all cores)")
+    classify.add_argument("--model", help="model file (default: $CONTRACTAI_CLASSIFIER)")
+    classify.add_argument("--batch-size", type=int, default=512)
+    classify.set_defaults(func=classify_main)
+
+    index = sub.add_parser("index-clauses", help="add every contract under a directory to the clause similarity index")
+    index.add_argument("directory")
+    index.add_argument("--index", default="clause_index", help="index directory (default: clause_index)")
+    index.add_argument("-j", "--workers", type=int, default=None, help="extraction processes (default: all cores)")
+    index.set_defaults(func=index_main)
+
+    search = sub.add_parser("search-clauses", help="find indexed clauses similar to a query, as JSON lines")
+    search.add_argument("query", help="clause text to match")
+    search.add_argument("--index", default="clause_index", help="index directory (default: clause_index)")
+    search.add_argument("-k", type=int, default=10, help="number of results")
+    search.set_defaults(func=search_main)
+
+    search_text = sub.add_parser("search-text", help="phrase/boolean search of the full-text index, as JSON lines")
+    search_text.add_argument("query", help='e.g. "sole arbitrator" AND (mumbai OR pune) -lease')
+    search_text.add_argument("--index", default="text_index", help="index directory (default: text_index)")
+    search_text.add_argument("--type", type=str.upper)
+    search_text.add_argument("--risk", type=str.upper)
+    search_text.add_argument("--limit", type=int, default=100)
+    search_text.set_defaults(func=search_text_main)
+
+    serve = sub.add_parser("serve", help="run the local HTTP analysis service")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    serve.add_argument("--max-pending", type=int, default=None, help="receiving+queued+running uploads before 429 (default: 4 per worker)")
+    serve.add_argument("--max-body", type=int, default=50, help="largest accepted upload in MB, else 413 (default: 50)")
+    serve.add_argument("--cache-dir", default=".contractai_cache")
+    serve.add_argument("--no-cache", action="store_true")
+    serve.add_argument("--audit-log", default="audit_log.json")
+    serve.add_argument("--audit-db", default="audit.db")
+    serve.add_argument("--no-audit", action="store_true")
+    serve.set_defaults(func=serve_main)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+from decimal import Decimal, localcontext
+from typing import Iterator, Optional
+
+from contractai.patterns import PATTERNS
+from contractai.types import AmountRecord
+
+UNIT_MULTIPLIERS = {"INR": 1, "LAKH": 100_000, "CRORE": 10_000_000}
+# Longest-unit patterns first so "12,00,000 Lakhs" is not claimed by the bare
+# currency pattern before its unit is seen.
+RECORD_PATTERNS = ["amounts.lakh_crore", "amounts.currency", "amounts.keyword"]
+CONTEXT_WINDOW = 60
+
+
+def amount_unit(raw: str) -> str:
+    lowered = raw.lower()
+    if "crore" in lowered:
+        return "CRORE"
+    if "lakh" in lowered:
+        return "LAKH"
+    return "INR"
+
+
+def parse_amount(raw: str) -> tuple[Optional[int], str]:
+    """Return (value in paise, unit) for a raw amount string, or (None, unit)."""
+    unit = amount_unit(raw)
+    number = PATTERNS.search("amounts.number", raw)
+    if number is None:
+        return None, unit
+    digits = number.group().replace(",", "")
+    with localcontext() as ctx:
+        ctx.prec = len(digits) + 10  # exact: the default 28 digits would round 1.99...9 up to 2
+        return int(Decimal(digits) * UNIT_MULTIPLIERS[unit] * 100), unit
+
+
+def amount_context(text: str, start: int, end: int) -> Optional[str]:
+    context = None
+    for match in PATTERNS.finditer("amounts.context", text[max(0, start - CONTEXT_WINDOW):end]):
+        context = match.group(1).lower()
+    return context
+
+
+def extract_amount_records(text: str, offset: int = 0) -> Iterator[AmountRecord]:
+    spans = []
+    for name in RECORD_PATTERNS:
+        for match in PATTERNS.finditer(name, text):
+            start, end = match.span()
+            raw = match.group().strip()
+            if len(raw) <= 4 or not PATTERNS.search("amounts.digits", raw):
+                continue
+            if any(start < e and s < end for s, e in spans):
+                continue
+            spans.append((start, end))
+            value, unit = parse_amount(raw)
+            yield {"raw": raw, "value_paise": value, "unit": unit,
+                   "start": offset + start, "end": offset + end,
+                   "context": amount_context(text, start, end)}
@@ -0,0 +1,146 @@
+import atexit
+import glob
+import gzip
+import json
+import os
+import queue
+import shutil
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+FSYNC_POLICIES = ("always", "interval", "never")
+_STOP = object()
+
+
+def audit_record(result, time=None):
+    return {"hash": result["text_hash"], "time": time or datetime.now().isoformat(),
+            "type": result["type"], "risk": result["risk"], "parties": result["parties"]}
+
+
+class AuditLog:
+    """Append-only JSONL audit log written by a background thread.
+
+    ``write`` never blocks or raises: records are queued and flushed in
+    batches. When the queue is full or a write fails the records are counted
+    in ``dropped`` instead of being lost silently. The file is rotated by
+    size or age into gzip-compressed backups, keeping the newest ``backups``.
+    If ``store`` is given, every flushed batch is also added to it.
+    """
+
+    def __init__(self, path="audit_log.json", batch_size=100, flush_interval=1.0, fsync="interval",
+                 fsync_interval=5.0, max_bytes=10 * 1024 * 1024, max_age=None, backups=10, queue_size=10000, store=None):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}, got {fsync!r}")
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.backups = backups
+        self.store = store
+        self.written = 0
+        self.dropped = 0
+        self.rotations = 0
+        self.last_error = None
+        self._queue = queue.Queue(queue_size)
+        self._file = None
+        self._opened_at = 0.0
+        self._last_fsync = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="contractai-audit", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def write(self, record):
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def stats(self):
+        return {"written": self.written, "dropped": self.dropped, "rotations": self.rotations,
+                "pending": self._queue.qsize(), "last_error": self.last_error}
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch = []
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+                while True:
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+                    if len(batch) >= self.batch_size:
+                        break
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            if batch:
+                self._flush(batch)
+            elif self._file is not None and self._expired():
+                try:
+                    self._rotate()
+                except OSError as e:
+                    self.last_error = f"{type(e).__name__}: {e}"
+        if self._file is not None:
+            self._sync(force=self.fsync != "never")
+            self._file.close()
+
+    def _flush(self, batch):
+        try:
+            if self._file is not None and (self._file.tell() >= self.max_bytes or self._expired()):
+                self._rotate()
+            if self._file is None:
+                self._open()
+            self._file.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in batch))
+            self._file.flush()
+            self._sync()
+            self.written += len(batch)
+        except (OSError, TypeError, ValueError) as e:
+            self.dropped += len(batch)
+            self.last_error = f"{type(e).__name__}: {e}"
+            return
+        if self.store is not None:
+            try:
+                self.store.add_many(batch)
+            except sqlite3.Error as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+
+    def _open(self):
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._opened_at = time.monotonic()
+
+    def _expired(self):
+        return self.max_age is not None and time.monotonic() - self._opened_at >= self.max_age
+
+    def _sync(self, force=False):
+        now = time.monotonic()
+        if force or self.fsync == "always" or (self.fsync == "interval" and now - self._last_fsync >= self.fsync_interval):
+            os.fsync(self._file.fileno())
+            self._last_fsync = now
+
+    def _rotate(self):
+        self._sync(force=self.fsync != "never")
+        self._file.close()
+        self._file = None
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return
+        rotated = f"{self.path}.{datetime.now().strftime('%Y%m%dT%H%M%S%f')}"
+        os.replace(self.path, rotated)
+        with open(rotated, "rb") as src, gzip.open(rotated + ".gz", "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(rotated)
+        self.rotations += 1
+        backups = sorted(glob.glob(glob.escape(self.path) + ".*.gz"))
+        for old in backups[:max(0, len(backups) - self.backups)]:
+            os.remove(old)
@@ -0,0 +1,120 @@
+import glob
+import gzip
+import json
+import sqlite3
+import threading
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    id INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL,
+    time TEXT NOT NULL,
+    type TEXT,
+    risk TEXT,
+    parties TEXT,
+    UNIQUE (hash, time)
+);
+CREATE INDEX IF NOT EXISTS analyses_time ON analyses (time);
+CREATE INDEX IF NOT EXISTS analyses_type_risk_time ON analyses (type, risk, time);
+CREATE INDEX IF NOT EXISTS analyses_risk_time ON analyses (risk, time);
+"""
+
+
+def _iso(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+class AuditStore:
+    """SQLite-backed, indexed store of audit records with a small query API."""
+
+    def __init__(self, path="audit.db"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def add_many(self, records):
+        rows = [(r["hash"], r["time"], r.get("type"), r.get("risk"), json.dumps(r.get("parties", {}), ensure_ascii=False))
+                for r in records]
+        with self._lock, self._conn:
+            cur = self._conn.executemany(
+                "INSERT OR IGNORE INTO analyses (hash, time, type, risk, parties) VALUES (?, ?, ?, ?, ?)", rows)
+        return cur.rowcount
+
+    def add(self, record):
+        return self.add_many([record])
+
+    def _where(self, hash=None, type=None, risk=None, since=None, until=None):
+        clauses, params = [], []
+        for column, value in (("hash", hash), ("type", type), ("risk", risk)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("time >= ?")
+            params.append(_iso(since))
+        if until is not None:
+            clauses.append("time < ?")
+            params.append(_iso(until))
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def query(self, hash=None, type=None, risk=None, since=None, until=None, limit=1000):
+        """Newest-first audit records matching every given filter.
+
+        ``since`` is inclusive and ``until`` exclusive; both take ISO strings
+        or datetimes, e.g. ``query(type="LEASE", risk="HIGH", since="2026-09-01")``.
+        """
+        where, params = self._where(hash, type, risk, since, until)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT hash, time, type, risk, parties FROM analyses{where} ORDER BY time DESC LIMIT ?",
+                params + [limit]).fetchall()
+        return [{"hash": h, "time": t, "type": ct, "risk": r, "parties": json.loads(p or "{}")}
+                for h, t, ct, r, p in rows]
+
+    def count(self, hash=None, type=None, risk=None, since=None, until=None):
+        where, params = self._where(hash, type, risk, since, until)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM analyses{where}", params).fetchone()[0]
+
+    def import_jsonl(self, path, batch_size=10000):
+        """Load an audit_log.json-style file (optionally .gz); returns rows added."""
+        opener = gzip.open if path.endswith(".gz") else open
+        added, batch = 0, []
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict) and "hash" in record and "time" in record:
+                    batch.append(record)
+                if len(batch) >= batch_size:
+                    added += self.add_many(batch)
+                    batch = []
+        return added + (self.add_many(batch) if batch else 0)
+
+    def import_logs(self, log_path):
+        """Import a log together with its rotated .gz backups, oldest first."""
+        paths = sorted(glob.glob(glob.escape(log_path) + ".*.gz")) + glob.glob(glob.escape(log_path))
+        return sum(self.import_jsonl(path) for path in paths)
+
+    def close(self):
+        self._conn.close()
+
+
+def audit_main(args):
+    store = AuditStore(args.db)
+    if args.audit_command == "import":
+        added = sum(store.import_logs(path) for path in args.logs)
+        print(f"imported {added} records into {args.db}")
+    else:
+        for record in store.query(args.hash, args.type, args.risk, args.since, args.until, args.limit):
+            print(json.dumps(record, ensure_ascii=False))
+    store.close()
+    return 0
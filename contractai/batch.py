@@ -0,0 +1,101 @@
+import json
+import os
+import sys
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from contractai.patterns import PATTERNS
+from contractai.pipeline import analyze_contract
+from contractai.templates import open_templates
+from contractai.text_index import TextIndex, document_tokens
+
+SUPPORTED_EXTENSIONS = (".pdf", ".docx", ".txt")
+
+
+def iter_contracts(root):
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename.lower().endswith(SUPPORTED_EXTENSIONS):
+                yield os.path.join(dirpath, filename)
+
+
+def analyze_path(path, trace_memory=False, templates=None, keep_text=False):
+    try:
+        index = open_templates(templates) if templates else None
+        with open(path, "rb") as f:
+            result = analyze_contract(f, path.lower(), trace_memory=trace_memory, templates=index, keep_text=keep_text)
+    except Exception as e:
+        return {"path": path, "error": f"{type(e).__name__}: {e}"}
+    return {"path": path, **result}
+
+
+def _analyze_with_stats(path, trace_memory=False, templates=None, index_text=False):
+    PATTERNS.reset()
+    record = analyze_path(path, trace_memory, templates, index_text)
+    # Tokens rather than text go back to the parent: smaller to pickle, and the index wants nothing else.
+    tokens = document_tokens(record.pop("text")) if "text" in record else None
+    return record, PATTERNS.stats(), tokens
+
+
+def _collect(future, text_index):
+    record, stats, tokens = future.result()
+    PATTERNS.merge(stats)
+    if tokens is not None and text_index is not None:
+        text_index.add_tokens(record["text_hash"], record["path"], record["type"], record["risk"], *tokens)
+    return record
+
+
+def run_batch(paths, workers=None, window=None, trace_memory=False, templates=None, text_index=None):
+    """Analyze paths on a process pool, yielding results as they complete.
+
+    At most ``window`` files are in flight at once, so a directory of tens of
+    thousands of contracts never materializes all its futures in memory.
+    ``templates`` is the path of a shared TemplateIndex database; documents
+    are added to ``text_index`` (a TextIndex) from this process, as the
+    only writer.
+    """
+    workers = workers or os.cpu_count() or 1
+    window = window or workers * 4
+    paths = iter(paths)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for path in paths:
+            pending.add(pool.submit(_analyze_with_stats, path, trace_memory, templates, text_index is not None))
+            if len(pending) >= window:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield _collect(future, text_index)
+        for future in wait(pending).done:
+            yield _collect(future, text_index)
+    if text_index is not None:
+        text_index.flush()
+
+
+def batch_main(args):
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    text_index = TextIndex(args.text_index) if args.text_index else None
+    failed = 0
+    seconds, peaks = Counter(), {}
+    try:
+        for record in run_batch(iter_contracts(args.directory), args.workers, trace_memory=args.trace_memory,
+                                templates=args.templates, text_index=text_index):
+            failed += "error" in record
+            for name, stat in record.get("stages", {}).items():
+                seconds[name] += stat["seconds"]
+                peaks[name] = max(peaks.get(name, 0), stat.get("peak_kb", 0))
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if text_index is not None:
+            text_index.close()
+    if args.pattern_stats:
+        for name, stat in sorted(PATTERNS.stats().items()):
+            print(f"{name:28} calls={stat['calls']:<8} hits={stat['hits']:<8} {stat['seconds'] * 1e3:.1f}ms", file=sys.stderr)
+    if args.stage_stats:
+        for name, total in seconds.most_common():
+            peak = f" peak={peaks[name]:.1f}KiB" if args.trace_memory else ""
+            print(f"{name:28} {total * 1e3:.1f}ms{peak}", file=sys.stderr)
+    return 1 if failed else 0
@@ -0,0 +1,123 @@
+import hashlib
+import json
+import os
+import tempfile
+
+from contractai.metrics import METRICS
+
+# Bump when the shape of a cached analysis or the analysis code itself changes.
+SCHEMA_VERSION = 10
+
+CACHE_REQUESTS = METRICS.counter("contractai_cache_requests_total", "Cache lookups by cache and outcome (hit/miss).",
+                                 ("cache", "result"))
+
+
+def rules_version(rules):
+    payload = json.dumps({"schema": SCHEMA_VERSION, "rules": rules}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def upload_key(file_content, name):
+    ext = os.path.splitext(name)[1].lower().lstrip(".")
+    return f"{ext}-{hashlib.sha256(file_content).hexdigest()}"
+
+
+class AnalysisCache:
+    """On-disk analysis cache with LRU eviction, one JSON file per upload.
+
+    Entries are namespaced by rule-set version, so changing RISK_RULES makes
+    every older entry unreachable; they are deleted on the next eviction pass.
+    """
+
+    suffix = ".json"
+    kind = "analysis"
+
+    def __init__(self, root, version, max_bytes=256 * 1024 * 1024):
+        self.root = root
+        self.version = version
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.root, f"{self.version}-{key}{self.suffix}")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            CACHE_REQUESTS.inc(self.kind, "miss")
+            return None
+        CACHE_REQUESTS.inc(self.kind, "hit")
+        try:
+            os.utime(path)  # mtime doubles as the LRU timestamp
+        except OSError:
+            pass
+        return result
+
+    def put(self, key, result):
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(result, f, ensure_ascii=False)
+            os.replace(tmp, self._path(key))
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return
+        self.evict()
+
+    def evict(self):
+        entries, total = [], 0
+        for entry in os.scandir(self.root):
+            if not entry.name.endswith(self.suffix):
+                continue
+            try:
+                if not entry.name.startswith(self.version + "-"):
+                    os.remove(entry.path)
+                    continue
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+
+class ReportCache(AnalysisCache):
+    """Rendered PDF reports, one file per analysis, under the same LRU policy."""
+
+    suffix = ".pdf"
+    kind = "report"
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            os.utime(path)
+        except OSError:
+            CACHE_REQUESTS.inc(self.kind, "miss")
+            return None
+        CACHE_REQUESTS.inc(self.kind, "hit")
+        return path
+
+    def temp_path(self):
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        os.close(fd)
+        return tmp
+
+    def put_file(self, key, tmp):
+        path = self._path(key)
+        os.replace(tmp, path)
+        self.evict()
+        return path
@@ -0,0 +1,191 @@
+import json
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from contractai.patterns import PATTERNS
+
+# Below this top-class probability a document is labelled GENERAL.
+MIN_CONFIDENCE = 0.4
+
+
+def token_counts(text):
+    return Counter(PATTERNS.findall("classifier.token", text.lower()))
+
+
+class TfidfClassifier:
+    """Sparse TF-IDF features with a softmax linear model, all in NumPy.
+
+    Documents are scored in batches: the non-zero (document, term) entries of
+    the whole batch are weighted, normalized and multiplied into the weight
+    matrix with a handful of array operations.
+    """
+
+    def __init__(self, classes, vocabulary, idf, weights, bias):
+        self.classes = list(classes)
+        self.vocabulary = list(vocabulary)
+        self.index = {term: i for i, term in enumerate(self.vocabulary)}
+        self.idf = idf
+        self.weights = weights
+        self.bias = bias
+
+    def _features(self, counts):
+        import numpy as np
+        rows, cols, tfs = [], [], []
+        for row, doc in enumerate(counts):
+            for term, n in doc.items():
+                col = self.index.get(term)
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+                    tfs.append(n)
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        values = (1 + np.log(np.asarray(tfs, dtype=np.float32))) * self.idf[cols]
+        norms = np.sqrt(np.bincount(rows, values * values, minlength=len(counts)))
+        values /= norms[rows]
+        return rows, cols, values.astype(np.float32)
+
+    def _probabilities(self, rows, cols, values, n):
+        """Softmax of the linear scores of n documents given as sparse features, grouped by row."""
+        import numpy as np
+        scores = np.tile(self.bias, (n, 1))
+        if len(rows):
+            starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+            scores[rows[starts]] += np.add.reduceat(values[:, None] * self.weights[cols], starts)
+        scores -= scores.max(axis=1, keepdims=True)
+        np.exp(scores, out=scores)
+        return scores / scores.sum(axis=1, keepdims=True)
+
+    def predict_proba_counts(self, counts):
+        """(len(counts), len(classes)) class probabilities for token Counters."""
+        return self._probabilities(*self._features(counts), len(counts))
+
+    def predict_proba(self, texts):
+        return self.predict_proba_counts([token_counts(text) for text in texts])
+
+    def classify_counts(self, counts, min_confidence=MIN_CONFIDENCE):
+        """[(label, {class: probability})] per document; GENERAL when no class is confident."""
+        results = []
+        for probs in self.predict_proba_counts(counts).tolist():
+            best = max(range(len(probs)), key=probs.__getitem__)
+            label = self.classes[best] if probs[best] >= min_confidence else "GENERAL"
+            results.append((label, {c: round(p, 4) for c, p in zip(self.classes, probs)}))
+        return results
+
+    def classify(self, texts, min_confidence=MIN_CONFIDENCE):
+        return self.classify_counts([token_counts(text) for text in texts], min_confidence)
+
+    @classmethod
+    def fit(cls, counts, labels, min_df=2, max_features=20000, epochs=1000, learning_rate=2.0, l2=1e-4):
+        """Train on token Counters with full-batch gradient descent on the softmax loss.
+
+        Features stay in sparse (row, column, value) form: each epoch costs
+        two passes over the non-zero entries, never a dense documents x
+        vocabulary matrix.
+        """
+        import numpy as np
+        df = Counter(term for doc in counts for term in doc)
+        vocabulary = sorted(t for t, n in df.most_common(max_features) if n >= min_df)
+        classes = sorted(set(labels))
+        n = len(counts)
+        idf = np.log((1 + n) / (1 + np.array([df[t] for t in vocabulary], dtype=np.float32))) + 1
+        model = cls(classes, vocabulary, idf.astype(np.float32),
+                    np.zeros((len(vocabulary), len(classes)), dtype=np.float32), np.zeros(len(classes), dtype=np.float32))
+
+        rows, cols, values = model._features(counts)
+        # The same entries grouped by column, for the weight gradient X.T @ error.
+        by_term = np.argsort(cols, kind="stable")
+        term_rows, term_values, term_cols = rows[by_term], values[by_term, None], cols[by_term]
+        term_starts = np.flatnonzero(np.r_[True, term_cols[1:] != term_cols[:-1]]) if len(cols) else by_term
+        terms = term_cols[term_starts]
+        y = np.zeros((n, len(classes)), dtype=np.float32)
+        y[np.arange(n), [classes.index(label) for label in labels]] = 1
+        for _ in range(epochs):
+            error = (model._probabilities(rows, cols, values, n) - y) / n
+            gradient = l2 * model.weights
+            if len(terms):
+                gradient[terms] += np.add.reduceat(term_values * error[term_rows], term_starts)
+            model.weights -= learning_rate * gradient
+            model.bias -= learning_rate * error.sum(axis=0)
+        return model
+
+    def save(self, path):
+        import numpy as np
+        with open(path, "wb") as f:
+            np.savez_compressed(f, classes=np.array(self.classes), vocabulary=np.array(self.vocabulary),
+                                idf=self.idf, weights=self.weights, bias=self.bias)
+
+    @classmethod
+    def load(cls, path):
+        import numpy as np
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data["classes"].tolist(), data["vocabulary"].tolist(), data["idf"], data["weights"], data["bias"])
+
+
+def _file_counts(path):
+    # The Hindi-normalized text the pipeline counts tokens from, so train and serve share a vocabulary.
+    from contractai.pipeline import document_text
+    try:
+        with open(path, "rb") as f:
+            return path, token_counts(document_text(f, path.lower()))
+    except Exception as e:
+        return path, f"{type(e).__name__}: {e}"
+
+
+def _iter_file_counts(paths, workers):
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        yield from pool.map(_file_counts, paths, chunksize=16)
+
+
+def train_main(args):
+    """Train on a corpus laid out as <corpus>/<LABEL>/<contract files>."""
+    from contractai.batch import iter_contracts
+    output = args.output
+    paths = list(iter_contracts(args.corpus))
+    counts, labels = [], []
+    for path, doc in _iter_file_counts(paths, args.workers):
+        if isinstance(doc, str):
+            print(f"skipped {path}: {doc}", file=sys.stderr)
+            continue
+        counts.append(doc)
+        labels.append(os.path.basename(os.path.dirname(path)).upper())
+    model = TfidfClassifier.fit(counts, labels, epochs=args.epochs)
+    model.save(output)
+    correct = sum(label == truth for (label, _), truth in zip(model.classify_counts(counts), labels))
+    print(f"trained on {len(labels)} contracts, {len(model.vocabulary)} terms, classes {', '.join(model.classes)}; "
+          f"training accuracy {correct / max(len(labels), 1):.1%} -> {output}; "
+          f"set CONTRACTAI_CLASSIFIER={output} to use it", file=sys.stderr)
+    return 0
+
+
+def classify_main(args):
+    from contractai.batch import iter_contracts
+    from contractai.pipeline import CLASSIFIER_PATH
+    if not (args.model or CLASSIFIER_PATH):
+        print("no classifier model: pass --model or set CONTRACTAI_CLASSIFIER", file=sys.stderr)
+        return 2
+    model = TfidfClassifier.load(args.model or CLASSIFIER_PATH)
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    batch, failed = [], 0
+
+    def flush():
+        for (path, counts), (label, confidences) in zip(batch, model.classify_counts([c for _, c in batch])):
+            out.write(json.dumps({"path": path, "type": label, "confidences": confidences}) + "\n")
+        batch.clear()
+
+    try:
+        for path, doc in _iter_file_counts(iter_contracts(args.directory), args.workers):
+            if isinstance(doc, str):
+                failed += 1
+                out.write(json.dumps({"path": path, "error": doc}) + "\n")
+                continue
+            batch.append((path, doc))
+            if len(batch) >= args.batch_size:
+                flush()
+        flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 1 if failed else 0
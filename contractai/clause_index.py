@@ -0,0 +1,227 @@
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import sys
+import threading
+import zlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory file locks, so keep to one writing process there
+    fcntl = None
+
+from contractai.patterns import PATTERNS
+
+DIM = 256
+SEARCH_CHUNK = 65536
+STOPWORDS = frozenset("""the and shall any this that for with such all not are from its their other which
+by may will upon than been has have who under said""".split())
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    text_hash TEXT PRIMARY KEY,
+    name TEXT,
+    first_row INTEGER NOT NULL,
+    rows INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS clauses (
+    row INTEGER PRIMARY KEY,
+    text_hash TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    risk TEXT,
+    heading TEXT,
+    text TEXT NOT NULL
+);
+"""
+
+
+def clause_vectors(texts):
+    """(len(texts), DIM) float32 matrix of L2-normalized, signed hashed word 1- and 2-grams."""
+    import numpy as np
+    rows, cols, values = [], [], []
+    for row, text in enumerate(texts):
+        words = [w for w in PATTERNS.findall("clause_index.word", text.lower()) if w not in STOPWORDS]
+        for gram, n in Counter(words + [f"{a} {b}" for a, b in zip(words, words[1:])]).items():
+            h = zlib.crc32(gram.encode("utf-8"))
+            rows.append(row)
+            cols.append(h % DIM)
+            values.append((1 + math.log(n)) * (1 if h & 0x80000000 else -1))
+    matrix = np.zeros((len(texts), DIM), dtype=np.float32)
+    np.add.at(matrix, (rows, cols), values)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return matrix / norms
+
+
+def clause_rows(text, analyses):
+    """(vectors, metadata rows) for the clauses of an analysed document, located by their spans in text."""
+    clauses = [text[c["span"]["start"]:c["span"]["end"]] for c in analyses]
+    rows = [(i, c["risk"], c["span"]["heading"], clause[:300]) for i, (c, clause) in enumerate(zip(analyses, clauses))]
+    return clause_vectors(clauses), rows
+
+
+class ClauseIndex:
+    """Append-only clause similarity index in a directory.
+
+    Clause vectors are one raw float32 matrix (vectors.f32), memory-mapped
+    and scanned in chunks with one matrix-vector product each, so a query
+    over a million clauses reads ~1 GB from the page cache and no index
+    structure has to be rebuilt on append. Clause metadata lives in SQLite
+    (clauses.db). Vectors are written before their metadata is committed;
+    rows beyond the committed count are ignored and overwritten.
+
+    Several processes (the app, index-clauses) may share a directory:
+    appends hold an exclusive lock on its lock file and searches a shared
+    one while they read the row count and map the vectors.
+    """
+
+    def __init__(self, path="clause_index"):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._vectors_path = os.path.join(path, "vectors.f32")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(path, "clauses.db"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._lock_file = open(os.path.join(path, "lock"), "a+b")
+        self._map = None
+
+    @contextmanager
+    def _file_lock(self, exclusive):
+        """Hold the directory's lock file, across processes; call with self._lock held."""
+        if fcntl is None:
+            yield
+            return
+        fcntl.flock(self._lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def __len__(self):
+        with self._lock:
+            return self._count()
+
+    def _count(self):
+        return self._conn.execute("SELECT COALESCE(MAX(first_row + rows), 0) FROM documents").fetchone()[0]
+
+    def __contains__(self, text_hash):
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM documents WHERE text_hash = ?", (text_hash,)).fetchone() is not None
+
+    def append(self, text_hash, name, vectors, rows):
+        """Add a document's clause vectors and (position, risk, heading, text) rows; False if already indexed."""
+        import numpy as np
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32).reshape(-1, DIM)
+        with self._lock, self._file_lock(exclusive=True):
+            if self._conn.execute("SELECT 1 FROM documents WHERE text_hash = ?", (text_hash,)).fetchone():
+                return False
+            first = self._count()
+            with open(self._vectors_path, "r+b" if os.path.exists(self._vectors_path) else "wb") as f:
+                f.seek(first * DIM * 4)
+                f.write(vectors.tobytes())
+                f.truncate()
+            with self._conn:
+                self._conn.execute("INSERT INTO documents (text_hash, name, first_row, rows) VALUES (?, ?, ?, ?)",
+                                   (text_hash, name, first, len(vectors)))
+                self._conn.executemany(
+                    "INSERT INTO clauses (row, text_hash, position, risk, heading, text) VALUES (?, ?, ?, ?, ?, ?)",
+                    [(first + i, text_hash, *row) for i, row in enumerate(rows)])
+            self._map = None
+        return True
+
+    def add(self, text_hash, name, text, analyses):
+        """Index the clauses of an analysis, sliced from the document_text its spans point into."""
+        if text_hash in self:
+            return False
+        return self.append(text_hash, name, *clause_rows(text, analyses))
+
+    def _matrix(self, count):
+        import numpy as np
+        if not count:
+            return np.empty((0, DIM), dtype=np.float32)
+        if self._map is None or len(self._map) != count:
+            self._map = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(count, DIM))
+        return self._map
+
+    def search(self, query, k=10, exclude=None):
+        """The k clauses most similar to the query text by cosine, best first.
+
+        ``exclude`` is a text_hash whose own clauses are skipped.
+        """
+        import numpy as np
+        q = clause_vectors([query])[0]
+        with self._lock, self._file_lock(exclusive=False):
+            count = self._count()
+            matrix = self._matrix(count)
+            skip = self._conn.execute("SELECT first_row, first_row + rows FROM documents WHERE text_hash = ?",
+                                      (exclude,)).fetchone() if exclude else None
+        if not q.any():
+            return []
+        rows, scores = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        for start in range(0, count, SEARCH_CHUNK):
+            chunk = matrix[start:start + SEARCH_CHUNK] @ q
+            if skip and skip[0] < start + len(chunk) and skip[1] > start:
+                chunk[max(skip[0] - start, 0):skip[1] - start] = -np.inf
+            top = np.argpartition(chunk, -k)[-k:] if len(chunk) > k else np.arange(len(chunk))
+            rows, scores = np.concatenate([rows, top + start]), np.concatenate([scores, chunk[top]])
+            if len(rows) > k:
+                keep = np.argpartition(scores, -k)[-k:]
+                rows, scores = rows[keep], scores[keep]
+        order = np.argsort(-scores, kind="stable")
+        rows, scores = rows[order], scores[order]
+        rows, scores = rows[np.isfinite(scores)], scores[np.isfinite(scores)]
+        if not len(rows):
+            return []
+        with self._lock:
+            found = {r[0]: r for r in self._conn.execute(
+                "SELECT c.row, c.text_hash, d.name, c.position, c.risk, c.heading, c.text FROM clauses c "
+                f"JOIN documents d USING (text_hash) WHERE c.row IN ({','.join('?' * len(rows))})",
+                [int(r) for r in rows])}
+        return [{"score": round(float(score), 4), "text_hash": found[row][1], "name": found[row][2],
+                 "position": found[row][3], "risk": found[row][4], "heading": found[row][5], "text": found[row][6]}
+                for row, score in zip(rows.tolist(), scores.tolist()) if row in found]
+
+    def close(self):
+        self._map = None
+        self._conn.close()
+        self._lock_file.close()
+
+
+def _file_rows(path):
+    from contractai.pipeline import analyze_clause, document_text, index_clauses
+    try:
+        with open(path, "rb") as f:
+            text = document_text(f, path.lower())
+    except Exception as e:
+        return path, None, f"{type(e).__name__}: {e}"
+    analyses = [analyze_clause(text[s["start"]:s["end"]], s) for s in index_clauses(text)]
+    return path, hashlib.sha256(text.encode()).hexdigest(), clause_rows(text, analyses)
+
+
+def index_main(args):
+    from contractai.batch import iter_contracts
+    index = ClauseIndex(args.index)
+    added = clauses = failed = 0
+    with ProcessPoolExecutor(max_workers=args.workers or os.cpu_count() or 1) as pool:
+        for path, text_hash, rows in pool.map(_file_rows, iter_contracts(args.directory), chunksize=16):
+            if isinstance(rows, str):
+                failed += 1
+                print(f"skipped {path}: {rows}", file=sys.stderr)
+            elif index.append(text_hash, path, *rows):
+                added += 1
+                clauses += len(rows[1])
+    print(f"indexed {added} contracts, {clauses} clauses; {len(index)} clauses in {args.index}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def search_main(args):
+    index = ClauseIndex(args.index)
+    for hit in index.search(args.query, args.k):
+        print(json.dumps(hit, ensure_ascii=False))
+    return 0
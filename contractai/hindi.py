@@ -0,0 +1,43 @@
+import json
+import os
+import re
+from typing import Iterable
+
+from contractai.patterns import PATTERNS
+
+DEFAULT_TERMS_PATH = os.path.join(os.path.dirname(__file__), "data", "hindi_terms.json")
+TERMS_PATH = os.environ.get("CONTRACTAI_HINDI_TERMS", DEFAULT_TERMS_PATH)
+
+
+def load_terms(path: str) -> dict[str, str]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def trie_pattern(terms: Iterable[str]) -> str:
+    """Regex source matching any of terms, factored as a trie so that matching
+    stays fast with thousands of entries. Longer terms win over their prefixes."""
+    trie = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node):
+        end = node.get("", False)
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return "(?:" + body + ")?" if end else body
+
+    return build(trie)
+
+
+HINDI_TERMS = load_terms(TERMS_PATH)
+PATTERNS.register("hindi.terms", trie_pattern(HINDI_TERMS) or r"(?!)")
+
+
+def normalize_hindi(text: str) -> str:
+    return PATTERNS.sub("hindi.terms", lambda m: HINDI_TERMS[m.group()], text)
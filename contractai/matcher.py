@@ -0,0 +1,72 @@
+from collections import deque
+
+# Below this many terms one C-level str.find scan per term beats a pure-Python
+# automaton pass over the text (benchmarks/bench_matcher.py).
+AUTOMATON_MIN_TERMS = 64
+
+
+class TermMatcher:
+    """Finds every occurrence of a fixed term set.
+
+    ``find`` reports all (start, end, term) hits, including overlapping ones,
+    ordered by end and then longest term first. Large term sets are compiled
+    into an Aho-Corasick automaton that makes a single left-to-right pass over
+    the text; small ones are scanned for one term at a time with str.find.
+    ``automaton`` forces either strategy.
+    """
+
+    def __init__(self, terms, automaton=None):
+        self.terms = list(dict.fromkeys(terms))
+        self.automaton = len(self.terms) >= AUTOMATON_MIN_TERMS if automaton is None else automaton
+        self._goto = self._output = None
+        if self.automaton:
+            self._build()
+
+    def _build(self):
+        goto, output = [{}], [()]
+        for term in self.terms:
+            node = 0
+            for ch in term:
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][ch] = nxt
+                    goto.append({})
+                    output.append(())
+                node = nxt
+            output[node] += (term,)
+
+        # Fold the failure links into the transition table in BFS order, so
+        # that ``find`` needs exactly one dict lookup per character.
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            output[node] += output[fail[node]]
+            for ch, nxt in goto[node].items():
+                fail[nxt] = goto[fail[node]].get(ch, 0)
+                queue.append(nxt)
+            for ch, nxt in goto[fail[node]].items():
+                goto[node].setdefault(ch, nxt)
+
+        self._goto, self._output = goto, output
+
+    def find(self, text):
+        if not self.automaton:
+            hits = []
+            for term in self.terms:
+                i = text.find(term)
+                while i >= 0:
+                    hits.append((i, i + len(term), term))
+                    i = text.find(term, i + 1)
+            hits.sort(key=lambda hit: (hit[1], hit[0]))
+            return hits
+        goto, output = self._goto, self._output
+        hits = []
+        node = 0
+        for i, ch in enumerate(text):
+            node = goto[node].get(ch, 0)
+            if output[node]:
+                for term in output[node]:
+                    hits.append((i + 1 - len(term), i + 1, term))
+        return hits
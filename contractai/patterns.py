@@ -0,0 +1,120 @@
+import re
+import threading
+from time import perf_counter
+
+
+class PatternRegistry:
+    """Named, precompiled regexes with per-pattern call/hit counters and timing."""
+
+    def __init__(self):
+        self._patterns = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, pattern, flags=0):
+        self._patterns[name] = re.compile(pattern, flags)
+        self._stats[name] = [0, 0, 0.0]  # calls, hits, seconds
+        return self._patterns[name]
+
+    def get(self, name):
+        return self._patterns[name]
+
+    def _record(self, name, hits, seconds):
+        with self._lock:
+            stat = self._stats[name]
+            stat[0] += 1
+            stat[1] += hits
+            stat[2] += seconds
+
+    def search(self, name, text, pos=0, endpos=None):
+        start = perf_counter()
+        match = self._patterns[name].search(text, pos, len(text) if endpos is None else endpos)
+        self._record(name, match is not None, perf_counter() - start)
+        return match
+
+    def findall(self, name, text):
+        start = perf_counter()
+        found = self._patterns[name].findall(text)
+        self._record(name, len(found), perf_counter() - start)
+        return found
+
+    def split(self, name, text):
+        start = perf_counter()
+        parts = self._patterns[name].split(text)
+        self._record(name, len(parts) - 1, perf_counter() - start)
+        return parts
+
+    def sub(self, name, repl, text):
+        start = perf_counter()
+        result, hits = self._patterns[name].subn(repl, text)
+        self._record(name, hits, perf_counter() - start)
+        return result
+
+    def finditer(self, name, text, pos=0):
+        it = self._patterns[name].finditer(text, pos)
+        hits, seconds = 0, 0.0
+        try:
+            while True:
+                start = perf_counter()
+                match = next(it, None)
+                seconds += perf_counter() - start
+                if match is None:
+                    break
+                hits += 1
+                yield match
+        finally:
+            self._record(name, hits, seconds)
+
+    def stats(self):
+        with self._lock:
+            return {name: {"calls": calls, "hits": hits, "seconds": seconds}
+                    for name, (calls, hits, seconds) in self._stats.items()}
+
+    def merge(self, stats):
+        with self._lock:
+            for name, s in stats.items():
+                stat = self._stats.setdefault(name, [0, 0, 0.0])
+                stat[0] += s["calls"]
+                stat[1] += s["hits"]
+                stat[2] += s["seconds"]
+
+    def reset(self):
+        with self._lock:
+            for stat in self._stats.values():
+                stat[:] = [0, 0, 0.0]
+
+
+PATTERNS = PatternRegistry()
+
+PATTERNS.register("hindi.devanagari", r"[\u0900-\u097F]")
+PATTERNS.register("text.whitespace", r"\s")
+PATTERNS.register("classifier.token", r"[a-z][a-z]+")
+PATTERNS.register("templates.word", r"\w+")
+PATTERNS.register("templates.digit", r"\d")
+PATTERNS.register("clause_index.word", r"[a-z]{3,}")
+PATTERNS.register("text_index.token", r"\w+")
+PATTERNS.register("text_index.query", r'(-?)"([^"]*)"|(-?)([^\s()"]+)|([()])')
+
+PATTERNS.register("parties.landlord", r"Landlord[:\s]+([A-Z][a-zA-Z\s&.,]+?)(?=\n|AND|$)", re.I)
+PATTERNS.register("parties.tenant", r"Tenant[:\s]+([A-Z][a-zA-Z\s&.,]+?)(?=\n|$)", re.I)
+PATTERNS.register("parties.between", r"BETWEEN\s+(.+?)(?:AND|\n{2,})", re.I | re.DOTALL)
+PATTERNS.register("parties.and", r"AND\s+(.+?)(?=\n{2,}|\()", re.I | re.DOTALL)
+
+PATTERNS.register("amounts.currency", r"(?:INR|₹|Rs\.?)\s*[\d,]+(?:\.\d+)?", re.I)
+PATTERNS.register("amounts.lakh_crore", r"\d{1,3}(?:,\d{3})+(?:\.\d+)?\s*(?:Lakhs?|Crores?)", re.I)
+PATTERNS.register("amounts.keyword", r"(?:salary|rent|payment|amount|deposit)\s+of\s+(?:INR|₹|Rs\.?)?[\d,]+", re.I)
+PATTERNS.register("amounts.digits", r"[\d,]{3,}")
+PATTERNS.register("amounts.number", r"\d[\d,]*(?:\.\d+)?")
+PATTERNS.register("amounts.context", r"\b(rent|salary|deposit|payment)\b", re.I)
+
+PATTERNS.register("jurisdiction.governed_by", r"governed by the laws? of\s+([A-Za-z\s]+?)(?=,|;| $)", re.I)
+PATTERNS.register("jurisdiction.laws_of", r"laws? of\s+([A-Za-z\s]+?)(?=governing|$)", re.I)
+PATTERNS.register("jurisdiction.courts_at", r"courts?\s+(?:at|in|of)\s+([A-Za-z\s]+?)(?:\s+shall|$)", re.I)
+PATTERNS.register("jurisdiction.exclusive", r"exclusive jurisdiction.*?([A-Za-z\s]+)", re.I)
+PATTERNS.register("jurisdiction.named_courts", r"([A-Za-z\s]+?)\s+courts?\s+(?:shall|have)", re.I)
+PATTERNS.register("jurisdiction.courts_verb", r"\s+courts?\s+(?:shall|have)", re.I)
+
+PATTERNS.register("clauses.break", r"\n(\d+)\.|Clause\s+(\d+)|Section\s+(\d+)")
+# A clauses.break match cut off by the end of the text: "\n12", "Section  ", "Clau".
+PATTERNS.register("clauses.partial", r"\n\d*\Z|(?:Clause|Section)\s*\Z|(?:C|Cl|Cla|Clau|Claus|S|Se|Sec|Sect|Secti|Sectio)\Z")
+PATTERNS.register("clauses.body", r"\S(?:[\s\S]*\S)?")
@@ -0,0 +1,544 @@
+import codecs
+import hashlib
+import mmap
+import multiprocessing
+import os
+import tempfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from functools import lru_cache
+from io import BytesIO
+from typing import BinaryIO, Iterable, Iterator, Literal, Optional, Sequence, Union
+from contractai.amounts import extract_amount_records
+from contractai.cache import rules_version
+from contractai.classifier import TfidfClassifier, token_counts
+from contractai.hindi import HINDI_TERMS, normalize_hindi
+from contractai.matcher import TermMatcher
+from contractai.metrics import METRICS
+from contractai.patterns import PATTERNS
+from contractai.profiling import StageTimer
+from contractai.templates import TemplateIndex, clause_hash, clause_signature, match_template
+from contractai.types import Analysis, ClauseAnalysis, ClauseSpan
+
+# PDFs shorter than this are extracted serially even when workers > 1, since
+# spawning the pool costs more than it saves.
+PARALLEL_PDF_MIN_PAGES = 64
+
+@contextmanager
+def _pdf_buffer(file_obj):
+    """A zero-copy view of the upload for PyMuPDF: the BytesIO buffer, or a
+    read-only memory map when the upload is a file on disk."""
+    if isinstance(file_obj, BytesIO):
+        view = file_obj.getbuffer()
+        try:
+            yield view
+        finally:
+            view.release()
+        return
+    with mmap.mmap(file_obj.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        view = memoryview(mapped)
+        try:
+            yield view
+        finally:
+            view.release()
+
+def _pdf_page_texts(path, start, stop):
+    import pymupdf as fitz
+    with fitz.open(path, filetype="pdf") as pdf:
+        return [pdf[i].get_text() for i in range(start, stop)]
+
+@lru_cache(maxsize=1)
+def _pdf_pool(workers):
+    """A page-extraction pool kept for the life of the process, since its workers are slow to start.
+
+    The app and the service run threads (audit writer, metrics server,
+    report pool) that a forked child could inherit mid-operation with a
+    lock held, so workers come from a forkserver (spawn where there is
+    none) that has already imported what they need.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(["contractai.pipeline", "pymupdf"])
+    else:
+        context = multiprocessing.get_context("spawn")
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context)
+
+def _iter_pdf_pages(file_obj, workers):
+    import pymupdf as fitz
+    with _pdf_buffer(file_obj) as data:
+        pdf = fitz.open(stream=data, filetype="pdf")
+        try:
+            pages = pdf.page_count
+            if workers <= 1 or pages < PARALLEL_PDF_MIN_PAGES:
+                yield from (page.get_text() for page in pdf)
+                return
+        finally:
+            pdf.close()
+        
+        # Workers reopen the PDF by path. In-memory uploads are spooled to one
+        # temporary file rather than pickled to every worker.
+        spool = None
+        if isinstance(file_obj, BytesIO) or not isinstance(getattr(file_obj, "name", None), str):
+            with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as spool:
+                spool.write(data)
+            path = spool.name
+        else:
+            path = file_obj.name
+        step = -(-pages // workers)
+        starts = range(0, pages, step)
+        stops = [min(start + step, pages) for start in starts]
+        try:
+            for shard in _pdf_pool(workers).map(_pdf_page_texts, [path] * len(starts), starts, stops):
+                yield from shard
+        except BrokenProcessPool:
+            _pdf_pool.cache_clear()
+            raise
+        finally:
+            if spool is not None:
+                os.remove(spool.name)
+
+TEXT_CHUNK_CHARS = 64 * 1024
+
+def _iter_docx_chunks(file_obj):
+    from docx import Document
+    doc = Document(file_obj)
+    chunk = []
+    size = 0
+    for p in doc.paragraphs:
+        chunk.append(p.text)
+        size += len(p.text)
+        if size >= TEXT_CHUNK_CHARS:
+            yield "\n".join(chunk)
+            chunk, size = [], 0
+    if chunk:
+        yield "\n".join(chunk)
+
+def _iter_txt_chunks(file_obj):
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    file_obj.seek(0)
+    carry = ""
+    while True:
+        block = file_obj.read(TEXT_CHUNK_CHARS)
+        if not block:
+            break
+        carry += decoder.decode(block)
+        cut = carry.rfind("\n") + 1
+        if cut:
+            yield carry[:cut]
+            carry = carry[cut:]
+    carry += decoder.decode(b"", final=True)
+    if carry:
+        yield carry
+
+def iter_text(file_obj: BinaryIO, name: str, workers: int = 1) -> Iterator[str]:
+    """Yield the document text piece by piece; "".join() of the pieces equals extract_text()."""
+    if name.endswith(".pdf"):
+        pieces, sep = _iter_pdf_pages(file_obj, workers), " "
+    elif name.endswith(".docx"):
+        pieces, sep = _iter_docx_chunks(file_obj), "\n"
+    else:
+        yield from _iter_txt_chunks(file_obj)
+        return
+    for i, piece in enumerate(pieces):
+        yield piece if i == 0 else sep + piece
+
+def extract_text(file_obj: BinaryIO, name: str, workers: int = 1) -> str:
+    return "".join(iter_text(file_obj, name, workers))
+
+PARTY_PATTERNS = {"Landlord": "parties.landlord", "Tenant": "parties.tenant",
+                  "between": "parties.between", "and": "parties.and"}
+
+def _scan_parties(text, found):
+    """Add the first match of each party pattern in text to found, keeping earlier matches.
+
+    Called once per scan window, so the landlord, the tenant and the
+    BETWEEN/AND names may each come from a different page.
+    """
+    for key, name in PARTY_PATTERNS.items():
+        if key in found or key in ("between", "and") and ("Landlord" in found or "Tenant" in found):
+            continue
+        match = PATTERNS.search(name, text)
+        if match:
+            found[key] = match.group(1).strip()
+    return found
+
+def _parties(found):
+    parties = {key: found[key] for key in ("Landlord", "Tenant") if key in found}
+    if not parties and "between" in found and "and" in found:
+        parties["Party 1"] = found["between"]
+        parties["Party 2"] = found["and"].split(':')[0].strip()
+    return parties
+
+def _find_parties(text):
+    return _parties(_scan_parties(text, {}))
+
+def extract_parties(text: str) -> dict[str, str]:
+    parties = _find_parties(text)
+    return parties if parties else {"Party 1": "Detected", "Party 2": "Detected"}
+
+AMOUNT_PATTERNS = ["amounts.currency", "amounts.lakh_crore", "amounts.keyword"]
+LAW_PATTERNS = ["jurisdiction.governed_by", "jurisdiction.laws_of"]
+COURT_PATTERNS = ["jurisdiction.courts_at", "jurisdiction.exclusive", "jurisdiction.named_courts"]
+# named_courts retries its lazy group from every letter and is quadratic in
+# the text when it fails; it cannot match without its linear-time suffix.
+COURT_PREFILTERS = {"jurisdiction.named_courts": "jurisdiction.courts_verb"}
+
+def extract_amounts(text: str) -> list[str]:
+    all_amounts = []
+    for name in AMOUNT_PATTERNS:
+        all_amounts.extend(PATTERNS.findall(name, text))
+    clean_amounts = [amt.strip() for amt in all_amounts if len(amt.strip()) > 4 and PATTERNS.search("amounts.digits", amt.strip())]
+    return list(set(clean_amounts))
+
+JURISDICTION_PATTERNS = {"Governing Law": LAW_PATTERNS, "Jurisdiction": COURT_PATTERNS}
+
+def _scan_jurisdiction(text, found, pending):
+    """Add the first match of each jurisdiction pattern in text to found, keeping earlier matches.
+
+    Patterns below one already found are skipped. A match running to the end
+    of text may rely on $ or be cut short, so it goes to pending instead,
+    replacing the previous window's; only the last window's pending matches
+    are final.
+    """
+    for names in JURISDICTION_PATTERNS.values():
+        for name in names:
+            if name in found:
+                break
+            pending.pop(name, None)
+            if name in COURT_PREFILTERS and not PATTERNS.search(COURT_PREFILTERS[name], text):
+                continue
+            match = PATTERNS.search(name, text)
+            if match:
+                (pending if match.end() >= len(text) - 1 else found)[name] = match.group(1).strip()
+    return found
+
+def _jurisdiction(found):
+    jurisdiction = {}
+    for key, names in JURISDICTION_PATTERNS.items():
+        name = next((name for name in names if name in found), None)
+        if name is not None:
+            jurisdiction[key] = found[name]
+    return jurisdiction
+
+def extract_jurisdiction(text: str) -> dict[str, str]:
+    found, pending = {}, {}
+    _scan_jurisdiction(text, found, pending)
+    return _jurisdiction({**pending, **found})
+
+CONTRACT_KEYWORDS = [
+    ("EMPLOYMENT", ["employee", "salary", "employment"]),
+    ("LEASE", ["lease", "rent", "tenant", "landlord"]),
+    ("PARTNERSHIP", ["partner", "partnership"]),
+    ("SERVICE", ["service", "vendor"]),
+]
+
+def _keyword_types(text):
+    t = text.lower()
+    return {ctype for ctype, words in CONTRACT_KEYWORDS if any(word in t for word in words)}
+
+def _pick_type(types):
+    return next((ctype for ctype, _ in CONTRACT_KEYWORDS if ctype in types), "GENERAL")
+
+# Trained TF-IDF model (python -m contractai train-classifier), used only when
+# configured; otherwise the keyword cascade above is used. A model only knows
+# the classes it was trained on, so train it on contracts like the ones it
+# will see, including GENERAL ones.
+CLASSIFIER_PATH = os.environ.get("CONTRACTAI_CLASSIFIER") or None
+
+@lru_cache(maxsize=1)
+def load_classifier() -> Optional[TfidfClassifier]:
+    return TfidfClassifier.load(CLASSIFIER_PATH) if CLASSIFIER_PATH else None
+
+def _classify(types, counts):
+    model = load_classifier()
+    if model is None:
+        ctype = _pick_type(types)
+        return ctype, {ctype: 1.0}
+    return model.classify_counts([counts])[0]
+
+def classify_contract(text: str) -> str:
+    return _classify(_keyword_types(text), token_counts(text))[0]
+
+def _heading(m):
+    return m.group().strip(), int(m.group(m.lastindex))
+
+def _clause_span(text, start, end, base, heading):
+    body = PATTERNS.search("clauses.body", text, start, end)
+    if body is None or body.end() - body.start() <= 25:
+        return None
+    return {"start": base + body.start(), "end": base + body.end(), "heading": heading[0], "number": heading[1]}
+
+def _iter_spans(text, base=0, heading=("", None)):
+    start = 0
+    for m in PATTERNS.finditer("clauses.break", text):
+        span = _clause_span(text, start, m.start(), base, heading)
+        if span:
+            yield span
+        heading, start = _heading(m), m.end()
+    span = _clause_span(text, start, len(text), base, heading)
+    if span:
+        yield span
+
+def index_clauses(text: str) -> list[ClauseSpan]:
+    """(start, end, heading, number) of every clause in text, without copying clause text.
+
+    ``text[span["start"]:span["end"]]`` is the clause, as returned by extract_clauses.
+    """
+    return list(_iter_spans(text))
+
+def extract_clauses(text: str) -> list[str]:
+    return [text[span["start"]:span["end"]] for span in _iter_spans(text)]
+
+def _partial_break(text):
+    """Start of a clause heading at the end of text that more text may complete, or len(text)."""
+    i = len(text)
+    while i and (text[i - 1].isspace() or text[i - 1].isdecimal()):
+        i -= 1
+    m = PATTERNS.search("clauses.partial", text, max(0, i - len("Section")))
+    return m.start() if m else len(text)
+
+def iter_clause_spans(pieces: Iterable[str]) -> Iterator[tuple[ClauseSpan, str]]:
+    """Split clauses incrementally, holding only the text since the last heading.
+
+    Spans are offsets into "".join(pieces); each clause's text is sliced out
+    once, as it leaves the buffer.
+    """
+    buf, pos, base, heading = "", 0, 0, ("", None)
+    for piece in pieces:
+        buf += piece
+        start, pending = 0, len(buf)
+        for m in PATTERNS.finditer("clauses.break", buf, pos):
+            if m.end() == len(buf):  # the heading number may continue in the next piece
+                pending = m.start()
+                break
+            span = _clause_span(buf, start, m.start(), base, heading)
+            if span:
+                yield span, buf[span["start"] - base:span["end"] - base]
+            heading, start = _heading(m), m.end()
+        buf = buf[start:]
+        base += start
+        pos = min(pending - start, _partial_break(buf))
+    for span in _iter_spans(buf, base, heading):
+        yield span, buf[span["start"] - base:span["end"] - base]
+
+def iter_clauses(pieces: Iterable[str]) -> Iterator[str]:
+    for _, clause in iter_clause_spans(pieces):
+        yield clause
+
+RISK_RULES = {
+    "terminate immediate": ("HIGH", "Employer can terminate without notice"),
+    "without notice": ("HIGH", "No notice or severance protection"),
+    "non compete": ("HIGH", "Restricts future employment"),
+    "two years": ("HIGH", "Excessive non-compete duration"),
+    "perpetual": ("HIGH", "Unlimited lifelong obligation"),
+    "confidentiality": ("MEDIUM", "Long-term confidentiality obligation"),
+    "indemnity": ("HIGH", "Unlimited financial liability"),
+    "arbitration": ("MEDIUM", "Dispute resolution outside courts")
+}
+
+SUGGESTION_TERMS = ["terminate", "termination", "non compete", "perpetual"]
+RULE_MATCHER = TermMatcher(list(RISK_RULES) + SUGGESTION_TERMS)
+_RULE_ORDER = {term: i for i, term in enumerate(RISK_RULES)}
+
+def analyze_clause(clause: str, span: Optional[ClauseSpan] = None) -> ClauseAnalysis:
+    text = clause.lower()
+    matches = RULE_MATCHER.find(text)
+    found = {term for _, _, term in matches}
+    levels, reasons = [], []
+    for term in sorted(found & _RULE_ORDER.keys(), key=_RULE_ORDER.get):
+        level, reason = RISK_RULES[term]
+        levels.append(level)
+        reasons.append(reason)
+    
+    risk = "HIGH" if "HIGH" in levels else "MEDIUM" if "MEDIUM" in levels else "LOW"
+    explanation = (
+        "This clause significantly disadvantages one party and may lead to legal/financial harm."
+        if risk == "HIGH" else "This clause creates some imbalance or future uncertainty."
+        if risk == "MEDIUM" else "This clause is generally standard and low risk."
+    )
+    
+    suggestion = None
+    if risk == "HIGH" and ("terminate" in found or "termination" in found):
+        suggestion = "Add 30-day written notice or salary in lieu of notice."
+    elif risk == "HIGH" and "non compete" in found:
+        suggestion = "Limit to 6 months and specific competitors only."
+    elif risk == "HIGH" and "perpetual" in found:
+        suggestion = "Restrict to 2-3 years post-termination."
+    
+    hits = [{"term": term, "start": start, "end": end} for start, end, term in matches if term in RISK_RULES]
+    return {"text": clause[:300], "risk": risk, "reasons": reasons, "explanation": explanation,
+            "suggestion": suggestion, "matches": hits, "span": span}
+
+def contract_risk(analysed: Sequence[ClauseAnalysis]) -> str:
+    if any(c["risk"] == "HIGH" for c in analysed): return "HIGH"
+    if any(c["risk"] == "MEDIUM" for c in analysed): return "MEDIUM"
+    return "LOW"
+
+# Characters carried over from the previous piece, so that matches spanning
+# a page boundary are still seen by the document-level extractors.
+SCAN_OVERLAP = 2048
+
+DOCUMENTS = METRICS.counter("contractai_documents_total", "Contracts analyzed, by contract type and file format.",
+                            ("type", "format"))
+BYTES_PROCESSED = METRICS.counter("contractai_bytes_processed_total", "Uploaded bytes analyzed, by file format.",
+                                  ("format",))
+CONTRACT_RISK = METRICS.counter("contractai_contract_risk_total", "Contracts by overall contract_risk level.", ("risk",))
+STAGE_SECONDS = METRICS.histogram("contractai_stage_seconds", "Time spent in each pipeline stage per contract.",
+                                  ("stage",))
+ANALYSIS_SECONDS = METRICS.histogram("contractai_analysis_seconds", "Pipeline time per contract, by file format.",
+                                     ("format",))
+
+def _record_metrics(result, name, size):
+    fmt = os.path.splitext(name)[1].lower().lstrip(".")
+    DOCUMENTS.inc(result["type"], fmt)
+    BYTES_PROCESSED.inc(fmt, amount=size)
+    CONTRACT_RISK.inc(result["risk"])
+    for stage, stat in result["stages"].items():
+        STAGE_SECONDS.observe(stat["seconds"], stage)
+    ANALYSIS_SECONDS.observe(sum(stat["seconds"] for stat in result["stages"].values()), fmt)
+
+def _normalize_piece(piece):
+    return normalize_hindi(piece) if PATTERNS.search("hindi.devanagari", piece) else piece
+
+def _scan_pieces(pieces, facts, timer):
+    digest = hashlib.sha256()
+    tail, offset, pending = "", 0, {}
+    for piece in timer.iterate("extract_text", pieces):
+        with timer.stage("normalize_hindi"):
+            piece = _normalize_piece(piece)
+        digest.update(piece.encode())
+        if facts["text"] is not None:
+            facts["text"].append(piece)
+        
+        window = tail + piece
+        with timer.stage("extractors"):
+            _scan_parties(window, facts["parties"])
+            _scan_jurisdiction(window, facts["jurisdiction"], pending)
+            facts["amounts"].update(extract_amounts(window))
+            for record in extract_amount_records(window, offset - len(tail)):
+                facts["amount_records"].setdefault(record["start"], record)
+            facts["types"] |= _keyword_types(window)
+            if facts["tokens"] is not None:
+                facts["tokens"].update(token_counts(piece))
+        
+        tail = window[-SCAN_OVERLAP:]
+        cut = PATTERNS.search("text.whitespace", tail)
+        tail = tail[cut.end():] if cut else ""
+        offset += len(piece)
+        yield piece
+    for name, value in pending.items():
+        facts["jurisdiction"].setdefault(name, value)
+    facts["text_hash"] = digest.hexdigest()
+
+StreamEvent = Union[tuple[Literal["clause"], ClauseAnalysis], tuple[Literal["result"], Analysis]]
+
+Upload = Union[bytes, BinaryIO]
+
+def _upload_file(file_content):
+    return BytesIO(file_content) if isinstance(file_content, (bytes, bytearray, memoryview)) else file_content
+
+def _upload_size(file_obj):
+    if isinstance(file_obj, BytesIO):
+        return file_obj.getbuffer().nbytes
+    return os.fstat(file_obj.fileno()).st_size
+
+# Clauses whose stored signatures are looked up together; a lookup per clause
+# costs more than recomputing its analysis.
+TEMPLATE_BATCH = 256
+
+def _sign_clauses(templates, clauses, keys, signatures):
+    """Append the hash and MinHash signature of each clause, reusing signatures stored in templates.
+
+    Returns how many signatures were reused.
+    """
+    batch_keys = [clause_hash(clause) for clause in clauses]
+    stored = templates.clause_signatures(batch_keys)
+    keys.extend(batch_keys)
+    signatures.extend(stored[key] if key in stored else clause_signature(clause)
+                      for key, clause in zip(batch_keys, clauses))
+    return sum(key in stored for key in batch_keys)
+
+def stream_contract(file_content: Upload, name: str, workers: int = 1, trace_memory: bool = False,
+                    templates: Optional[TemplateIndex] = None, keep_text: bool = False) -> Iterator[StreamEvent]:
+    """Analyze a contract while it is still being extracted.
+
+    Yields ("clause", analysis) as soon as each clause is complete, then a
+    single ("result", result). Only a window of pages is held in memory.
+    The result's "stages" holds per-stage timings, plus tracemalloc peaks
+    when trace_memory is set.
+
+    ``file_content`` may be the upload's bytes or a binary file opened on
+    disk. Files are never read whole: TXT is decoded incrementally, DOCX is
+    read through its zip index and PDFs are memory-mapped for PyMuPDF.
+
+    With a TemplateIndex, clauses identical to one already indexed reuse its
+    MinHash signature, looked up TEMPLATE_BATCH clauses at a time, so
+    re-analysing a new version of a known contract costs little beyond text
+    extraction. The result's "template"
+    compares the upload clause by clause with its nearest known template or
+    previous version, and the contract is added to the index.
+
+    keep_text adds the normalized text (as from document_text) to the
+    result under "text", e.g. for full-text indexing without re-extraction.
+    """
+    facts = {"parties": {}, "jurisdiction": {}, "amounts": set(), "amount_records": {}, "types": set(),
+             "tokens": Counter() if load_classifier() is not None else None, "text": [] if keep_text else None}
+    file_obj = _upload_file(file_content)
+    version = analysis_version() if templates is not None else None
+    timer = StageTimer(trace_memory).start()
+    try:
+        pieces = _scan_pieces(iter_text(file_obj, name, workers), facts, timer)
+        analysed, keys, signatures, batch, reused = [], [], [], [], 0
+        for span, clause in timer.iterate("extract_clauses", iter_clause_spans(pieces)):
+            with timer.stage("analyze_clause"):
+                analysis = analyze_clause(clause, span)
+            analysed.append(analysis)
+            if templates is not None:
+                batch.append(clause)
+                if len(batch) == TEMPLATE_BATCH:
+                    with timer.stage("templates"):
+                        reused += _sign_clauses(templates, batch, keys, signatures)
+                    batch = []
+            yield "clause", analysis
+        template = None
+        if templates is not None:
+            with timer.stage("templates"):
+                reused += _sign_clauses(templates, batch, keys, signatures)
+                template = match_template(templates, facts["text_hash"], name, keys, signatures, analysed, version)
+            if template is not None:
+                template["reused_clauses"] = reused
+    finally:
+        timer.stop()
+    
+    ctype, type_confidence = _classify(facts["types"], facts["tokens"])
+    result = {
+        "text_hash": facts["text_hash"],
+        "type": ctype, "type_confidence": type_confidence, "risk": contract_risk(analysed),
+        "parties": _parties(facts["parties"]) or {"Party 1": "Detected", "Party 2": "Detected"},
+        "amounts": list(facts["amounts"]), "amount_records": sorted(facts["amount_records"].values(), key=lambda r: r["start"]),
+        "jurisdiction": _jurisdiction(facts["jurisdiction"]), "clauses": analysed, "template": template, "stages": timer.report(),
+    }
+    if keep_text:
+        result["text"] = "".join(facts["text"])
+    _record_metrics(result, name, _upload_size(file_obj))
+    yield "result", result
+
+def document_text(file_content: Upload, name: str, workers: int = 1) -> str:
+    """The normalized text that clause spans and amount offsets of an analysis point into."""
+    return "".join(_normalize_piece(piece) for piece in iter_text(_upload_file(file_content), name, workers))
+
+def analyze_contract(file_content: Upload, name: str, workers: int = 1, trace_memory: bool = False,
+                     templates: Optional[TemplateIndex] = None, keep_text: bool = False) -> Analysis:
+    for kind, payload in stream_contract(file_content, name, workers, trace_memory, templates, keep_text):
+        if kind == "result":
+            return payload
+
+def analysis_version() -> str:
+    """Fingerprint of everything that shapes an analysis; use it to namespace caches."""
+    model = None
+    if CLASSIFIER_PATH:
+        with open(CLASSIFIER_PATH, "rb") as f:
+            model = hashlib.sha256(f.read()).hexdigest()
+    return rules_version({"risk": RISK_RULES, "hindi": HINDI_TERMS, "classifier": model})
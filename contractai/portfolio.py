@@ -0,0 +1,104 @@
+import json
+import sys
+
+import numpy as np
+
+from contractai.amounts import UNIT_MULTIPLIERS
+
+# Digits of paise per unit; every multiplier is a power of ten.
+PAISE_DIGITS = {unit: len(str(multiplier * 100)) - 1 for unit, multiplier in UNIT_MULTIPLIERS.items()}
+
+
+def parse_amounts(raws):
+    """Vectorized parse_amount: raw amount strings -> int64 paise, -1 if unparsable or beyond int64.
+
+    Works on the fixed-width code-point matrix of the whole batch at once, so
+    thousands of amounts cost a handful of array operations instead of a
+    Python loop. Like parse_amount, only the first number (digits and commas,
+    then an optional decimal part) is read, and the result is truncated to
+    whole paise in integer arithmetic: every unit multiplier times 100 is a
+    power of ten, so truncation keeps the first 2, 7 or 9 fraction digits.
+    """
+    arr = np.asarray(raws, dtype=str)
+    if arr.size == 0:
+        return np.zeros(0, dtype=np.int64)
+    width = max(arr.dtype.itemsize // 4, 1) + 1  # a padding column so every number is followed by a non-digit
+    codes = np.ascontiguousarray(arr.astype(f"<U{width}")).view(np.uint32).reshape(len(arr), width)
+    rows, cols = np.arange(len(arr)), np.arange(width)
+
+    digit = (codes >= 48) & (codes <= 57)
+    found = digit.any(axis=1)
+    start = np.argmax(digit, axis=1)[:, None]
+    # The integer run: digits and commas from the first digit on.
+    tail = cols >= start
+    run = tail & (np.cumsum(tail & ~digit & (codes != 44), axis=1) == 0)
+    run_end = start[:, 0] + run.sum(axis=1)
+    next_col = np.minimum(run_end + 1, width - 1)
+    point = (codes[rows, np.minimum(run_end, width - 1)] == 46) & digit[rows, next_col] & (run_end + 1 < width)
+    after = (cols > run_end[:, None]) & point[:, None]
+    fraction = after & (np.cumsum(after & ~digit, axis=1) == 0)
+    integer = run & digit
+
+    lowered = np.char.lower(arr)
+    scale = np.where(np.char.find(lowered, "crore") >= 0, PAISE_DIGITS["CRORE"],
+                     np.where(np.char.find(lowered, "lakh") >= 0, PAISE_DIGITS["LAKH"], PAISE_DIGITS["INR"]))[:, None]
+    exponent = np.where(integer, np.cumsum(integer[:, ::-1], axis=1)[:, ::-1] - 1 + scale,
+                        np.where(fraction, scale - np.cumsum(fraction, axis=1), -1))
+    values = np.where(integer | fraction, codes.astype(np.int64) - 48, 0)
+    kept = exponent >= 0
+    # A non-zero digit at 10^19 paise or beyond cannot fit; below that the uint64 sum is exact.
+    overflow = (kept & (values > 0) & (exponent > 18)).any(axis=1)
+    powers = np.uint64(10) ** np.clip(exponent, 0, 18).astype(np.uint64)
+    terms = np.where(kept & (exponent <= 18), values.astype(np.uint64) * powers, np.uint64(0))
+    paise = terms.sum(axis=1, dtype=np.uint64)
+    overflow |= paise > np.uint64(np.iinfo(np.int64).max)
+    return np.where(found & ~overflow, paise.astype(np.int64), -1)
+
+
+def outliers(paise, k=3.0):
+    """Indices of values outside the Tukey fences (k x IQR) on a log scale."""
+    valid = paise > 0
+    if valid.sum() < 4:
+        return np.zeros(0, dtype=np.int64)
+    logs = np.log10(np.where(valid, paise, 1))
+    q1, q3 = np.percentile(logs[valid], [25, 75])
+    fence = k * (q3 - q1)
+    return np.flatnonzero(valid & ((logs < q1 - fence) | (logs > q3 + fence)))
+
+
+def summarize(paise, contexts):
+    paise = np.asarray(paise, dtype=np.int64)
+    contexts = np.asarray(contexts, dtype=object)
+    valid = paise > 0
+    by_context = {}
+    for context in sorted(set(contexts[valid].tolist()), key=str):
+        mask = valid & (contexts == context)
+        by_context[str(context or "other")] = {"count": int(mask.sum()), "total_inr": int(paise[mask].sum()) / 100}
+    return {
+        "count": int(valid.sum()),
+        "total_inr": int(paise[valid].sum()) / 100,
+        "median_inr": float(np.median(paise[valid])) / 100 if valid.any() else 0.0,
+        "by_context": by_context,
+    }
+
+
+def load_batch_amounts(lines):
+    paths, raws, contexts = [], [], []
+    for line in lines:
+        record = json.loads(line)
+        for amount in record.get("amount_records", []):
+            paths.append(record["path"])
+            raws.append(amount["raw"])
+            contexts.append(amount["context"])
+    return paths, raws, contexts
+
+
+def amounts_main(args):
+    with open(args.results, encoding="utf-8") if args.results != "-" else sys.stdin as f:
+        paths, raws, contexts = load_batch_amounts(f)
+    paise = parse_amounts(raws)
+    report = summarize(paise, contexts)
+    report["outliers"] = [{"path": paths[i], "raw": raws[i], "inr": int(paise[i]) / 100}
+                          for i in outliers(paise, args.fence).tolist()]
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0
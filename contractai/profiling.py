@@ -0,0 +1,80 @@
+import tracemalloc
+from contextlib import contextmanager
+from time import perf_counter
+
+
+class StageTimer:
+    """Exclusive wall time, call counts and optional tracemalloc peaks per stage.
+
+    Stages may nest (e.g. clause splitting pulls pages from extraction); time
+    and memory spent in an inner stage are charged to it, not to its parent.
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self._stats = {}
+        self._stack = []
+        self._started_tracing = False
+
+    def start(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        return self
+
+    def stop(self):
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def _fold_peak(self, frame):
+        _, peak = tracemalloc.get_traced_memory()
+        stat = self._stats[frame[0]]
+        stat[2] = max(stat[2], peak - frame[2])
+        tracemalloc.reset_peak()
+
+    @contextmanager
+    def stage(self, name):
+        now = perf_counter()
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if self._stack:
+            parent = self._stack[-1]
+            self._stats[parent[0]][0] += now - parent[1]
+            if tracing:
+                self._fold_peak(parent)
+        self._stats.setdefault(name, [0.0, 0, 0])
+        frame = [name, now, tracemalloc.get_traced_memory()[0] if tracing else 0]
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            now = perf_counter()
+            stat = self._stats[name]
+            stat[0] += now - frame[1]
+            stat[1] += 1
+            if tracing:
+                self._fold_peak(frame)
+            self._stack.pop()
+            if self._stack:
+                parent = self._stack[-1]
+                parent[1] = now
+                if tracing:
+                    parent[2] = tracemalloc.get_traced_memory()[0]
+
+    def iterate(self, name, iterable):
+        """Yield from iterable, charging the time spent producing each item to ``name``."""
+        it = iter(iterable)
+        while True:
+            with self.stage(name):
+                item = next(it, _DONE)
+            if item is _DONE:
+                return
+            yield item
+
+    def report(self):
+        return {name: {"seconds": round(seconds, 6), "calls": calls,
+                       **({"peak_kb": round(peak / 1024, 1)} if self.trace_memory else {})}
+                for name, (seconds, calls, peak) in self._stats.items()}
+
+
+_DONE = object()
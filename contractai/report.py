@@ -0,0 +1,103 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Optional, Union
+
+from contractai.profiling import StageTimer
+from contractai.types import Analysis, ReportData
+
+def report_data(analysis: Analysis) -> ReportData:
+    return {
+        "type": analysis["type"], "risk": analysis["risk"], "parties": analysis["parties"],
+        "amounts": analysis["amounts"], "jurisdiction": str(analysis["jurisdiction"]), "clauses": analysis["clauses"],
+    }
+
+def generate_pdf(data: ReportData, output: Optional[str] = None) -> Union[bytes, str]:
+    """Render the report to ``output`` (a file path) if given, else return its bytes."""
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.pagesizes import letter
+    
+    buffer = output or BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    styles = getSampleStyleSheet()
+    story = []
+    
+    story.append(Paragraph("ContractAI – Detailed Legal Analysis Report", styles["Title"]))
+    story.append(Spacer(1, 12))
+    
+    story.append(Paragraph(f"<b>Contract Type:</b> {data['type']}", styles["Normal"]))
+    story.append(Paragraph(f"<b>Overall Risk:</b> {data['risk']}", styles["Normal"]))
+    story.append(Spacer(1, 12))
+    
+    story.append(Paragraph("<b>Identified Parties</b>", styles["Heading2"]))
+    for role, name in data["parties"].items():
+        story.append(Paragraph(f"{role}: {name}", styles["Normal"]))
+    
+    story.append(Spacer(1, 12))
+    story.append(Paragraph("<b>Key Findings</b>", styles["Heading2"]))
+    story.append(Paragraph(f"Amounts found: {', '.join(data.get('amounts', []))}", styles["Normal"]))
+    story.append(Paragraph(f"Jurisdiction: {data.get('jurisdiction', 'Not specified')}", styles["Normal"]))
+    
+    story.append(Spacer(1, 12))
+    story.append(Paragraph("<b>Clause Analysis</b>", styles["Heading2"]))
+    for i, c in enumerate(data["clauses"], 1):
+        story.append(Spacer(1, 8))
+        story.append(Paragraph(f"<b>Clause {i} – Risk: {c['risk']}</b>", styles["Normal"]))
+        story.append(Paragraph(c["text"][:200] + "...", styles["Normal"]))
+        story.append(Paragraph(f"Explanation: {c['explanation']}", styles["Normal"]))
+        if c["suggestion"]:
+            story.append(Paragraph(f"Suggested Change: {c['suggestion']}", styles["Normal"]))
+    
+    doc.build(story)
+    if output is not None:
+        return output
+    return buffer.getvalue()
+
+
+class ReportRenderer:
+    """Renders reports on demand into a ReportCache, optionally in the background.
+
+    Reports are built straight into a temp file in the cache directory, so a
+    large clause set never sits in memory as a whole document. The
+    generate_pdf timing of each report rendered here is kept in ``stages``.
+    """
+
+    def __init__(self, cache, trace_memory=False):
+        self.cache = cache
+        self.trace_memory = trace_memory
+        self.stages = {}
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pending = {}
+
+    def cached(self, key: str) -> Optional[str]:
+        return self.cache.get(key)
+
+    def render(self, key: str, data: ReportData) -> str:
+        with self._lock:
+            path = self.cache.get(key)
+            if path is None:
+                tmp = self.cache.temp_path()
+                timer = StageTimer(self.trace_memory).start()
+                try:
+                    with timer.stage("generate_pdf"):
+                        generate_pdf(data, tmp)
+                except BaseException:
+                    os.remove(tmp)
+                    raise
+                finally:
+                    timer.stop()
+                self.stages[key] = timer.report()
+                path = self.cache.put_file(key, tmp)
+            return path
+
+    def prerender(self, key: str, data: ReportData) -> None:
+        if self.cache.get(key) is not None or key in self._pending:
+            return
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="contractai-report")
+        future = self._pool.submit(self.render, key, data)
+        self._pending[key] = future
+        future.add_done_callback(lambda _: self._pending.pop(key, None))
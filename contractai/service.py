@@ -0,0 +1,214 @@
+import asyncio
+import json
+import mmap
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from email.parser import BytesParser
+from email.policy import HTTP
+from urllib.parse import parse_qs, urlsplit
+
+from contractai.audit import AuditLog, audit_record
+from contractai.audit_store import AuditStore
+from contractai.cache import AnalysisCache, upload_key
+from contractai.metrics import CONTENT_TYPE, METRICS
+from contractai.pipeline import analysis_version, analyze_contract
+
+SUPPORTED_EXTENSIONS = (".pdf", ".docx", ".txt")
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 411: "Length Required",
+           413: "Payload Too Large", 415: "Unsupported Media Type", 429: "Too Many Requests",
+           500: "Internal Server Error"}
+
+
+SPOOL_CHUNK = 1024 * 1024
+MAX_BODY = 50 * 1024 * 1024
+
+
+def _analyze_in_worker(data, name):
+    METRICS.reset()
+    if isinstance(data, str):  # spooled upload: map the file instead of pickling its bytes
+        with open(data, "rb") as f:
+            result = analyze_contract(f, name)
+    else:
+        result = analyze_contract(data, name)
+    return result, METRICS.snapshot()
+
+
+def _spooled_key(path, name):
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        return upload_key(mapped, name)
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _read_upload(headers, query, body):
+    """(filename, data); data is the bytes of a multipart file part or the path of a spooled raw body."""
+    content_type = headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        message = BytesParser(policy=HTTP).parsebytes(b"Content-Type: " + content_type.encode() + b"\r\n\r\n" + body)
+        for part in message.iter_parts():
+            if part.get_filename():
+                return part.get_filename(), part.get_payload(decode=True)
+        raise HTTPError(400, "multipart upload has no file part")
+    name = query.get("filename", [headers.get("x-filename", "")])[0]
+    return name, body
+
+
+class AnalysisService:
+    """Asyncio HTTP front end that runs analyses on a bounded process pool.
+
+    At most ``max_pending`` uploads are being received, queued or running at
+    once. Beyond that the service answers 429 with Retry-After as soon as
+    the request headers are read, before any of the body is.
+    """
+
+    def __init__(self, workers=None, max_pending=None, max_body=MAX_BODY, cache=None, audit_log=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 4
+        self.max_body = max_body
+        self.cache = cache
+        self.audit_log = audit_log
+        self.pending = 0
+        self._pool = ProcessPoolExecutor(max_workers=self.workers)
+
+    async def analyze(self, name, data):
+        key = await asyncio.to_thread(_spooled_key, data, name) if isinstance(data, str) else upload_key(data, name)
+        result = self.cache.get(key) if self.cache is not None else None
+        if result is None:
+            loop = asyncio.get_running_loop()
+            result, metrics = await loop.run_in_executor(self._pool, _analyze_in_worker, data, name.lower())
+            METRICS.merge(metrics)
+            if self.cache is not None:
+                await asyncio.to_thread(self.cache.put, key, result)
+        record = audit_record(result)
+        if self.audit_log is not None:
+            self.audit_log.write(record)
+        return {**record, "type_confidence": result["type_confidence"], "amounts": result["amounts"], "amount_records": result["amount_records"],
+                "jurisdiction": result["jurisdiction"], "clauses": result["clauses"]}
+
+    async def route(self, method, target, headers, body):
+        url = urlsplit(target)
+        if url.path == "/health":
+            return 200, {"status": "ok", "pending": self.pending, "max_pending": self.max_pending}
+        if url.path == "/metrics":
+            return 200, METRICS.render()
+        if url.path != "/analyze":
+            raise HTTPError(404, f"no route for {url.path}")
+        if method != "POST":
+            raise HTTPError(405, "use POST /analyze")
+        name, data = _read_upload(headers, parse_qs(url.query), body)
+        if not name.lower().endswith(SUPPORTED_EXTENSIONS):
+            raise HTTPError(415, "pass a .pdf, .docx or .txt filename via ?filename=, X-Filename or multipart")
+        return 200, await self.analyze(name, data)
+
+    async def spool(self, reader, length):
+        """Stream a raw request body to a temp file, so it is never held in memory whole."""
+        fd, path = tempfile.mkstemp(prefix="contractai-upload-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                while length > 0:
+                    chunk = await reader.read(min(length, SPOOL_CHUNK))
+                    if not chunk:
+                        raise asyncio.IncompleteReadError(b"", length)
+                    f.write(chunk)
+                    length -= len(chunk)
+        except BaseException:
+            os.remove(path)
+            raise
+        return path
+
+    async def handle(self, reader, writer):
+        status, payload, extra = 500, {"error": "internal error"}, {}
+        body, reserved = b"", False
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            if len(request_line) != 3:
+                raise HTTPError(400, "malformed request line")
+            method, target, _ = request_line
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode("latin-1")
+                if line in ("\r\n", "\n", ""):
+                    break
+                key, _, value = line.partition(":")
+                headers[key.strip().lower()] = value.strip()
+            if method == "POST":
+                if "content-length" not in headers:
+                    raise HTTPError(411, "Content-Length is required")
+                length = headers["content-length"]
+                if not (length.isascii() and length.isdigit()):  # 1*DIGIT: no sign, so never negative
+                    raise HTTPError(400, "invalid Content-Length")
+                length = int(length)
+                if length > self.max_body:
+                    raise HTTPError(413, f"upload exceeds {self.max_body} bytes")
+                if length == 0:
+                    raise HTTPError(400, "empty upload")
+                if urlsplit(target).path == "/analyze":
+                    # Reject before reading the body, so refused uploads cost no I/O.
+                    if self.pending >= self.max_pending:
+                        raise HTTPError(429, "analysis queue is full, retry later")
+                    self.pending += 1
+                    reserved = True
+                if headers.get("expect", "").lower() == "100-continue":
+                    writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+                if headers.get("content-type", "").startswith("multipart/form-data"):
+                    body = await reader.readexactly(length)
+                else:
+                    body = await self.spool(reader, length)
+            status, payload = await self.route(method, target, headers, body)
+        except HTTPError as e:
+            status, payload = e.status, {"error": str(e)}
+            if e.status == 429:
+                extra["Retry-After"] = "1"
+        except (ValueError, asyncio.IncompleteReadError) as e:
+            status, payload = 400, {"error": f"{type(e).__name__}: {e}"}
+        except Exception as e:
+            status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+        finally:
+            if reserved:
+                self.pending -= 1
+            if isinstance(body, str):
+                os.remove(body)
+        if isinstance(payload, str):
+            body, content_type = payload.encode("utf-8"), CONTENT_TYPE
+        else:
+            body, content_type = json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8"
+        head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}", f"Content-Type: {content_type}",
+                f"Content-Length: {len(body)}", "Connection: close"]
+        head += [f"{k}: {v}" for k, v in extra.items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self._pool.shutdown(cancel_futures=True)
+
+
+def serve_main(args):
+    cache = None if args.no_cache else AnalysisCache(args.cache_dir, analysis_version())
+    audit_log = None if args.no_audit else AuditLog(args.audit_log, store=AuditStore(args.audit_db))
+    service = AnalysisService(args.workers, args.max_pending, args.max_body * 1024 * 1024, cache, audit_log)
+    print(f"ContractAI service on http://{args.host}:{args.port} ({service.workers} workers, "
+          f"max {service.max_pending} pending, uploads up to {args.max_body} MB)")
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+        if audit_log is not None:
+            audit_log.close()
+    return 0
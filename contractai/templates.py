@@ -0,0 +1,295 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import zlib
+from difflib import SequenceMatcher
+from functools import lru_cache
+
+from contractai.patterns import PATTERNS
+
+NUM_HASHES = 64
+BANDS = 16  # 16 bands of 4 rows: pairs above ~0.5 Jaccard almost always share a bucket
+MIN_SIMILARITY = 0.5
+SHINGLE_WORDS = 3
+_PRIME = (1 << 61) - 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS templates (
+    id INTEGER PRIMARY KEY,
+    text_hash TEXT NOT NULL UNIQUE,
+    name TEXT,
+    signature BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS buckets (
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    template_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS buckets_lookup ON buckets (band, bucket);
+CREATE TABLE IF NOT EXISTS clauses (
+    template_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    clause_hash TEXT NOT NULL,
+    signature BLOB NOT NULL,
+    analysis TEXT NOT NULL,
+    analysis_version TEXT,
+    PRIMARY KEY (template_id, position)
+);
+CREATE INDEX IF NOT EXISTS clauses_hash ON clauses (clause_hash);
+CREATE TABLE IF NOT EXISTS versions (
+    template_id INTEGER PRIMARY KEY,
+    parent_id INTEGER,
+    version INTEGER NOT NULL
+);
+"""
+
+
+def clause_hash(clause):
+    return hashlib.sha256(clause.encode("utf-8")).hexdigest()
+
+
+def shingles(text):
+    """Hashed word 3-grams, with digits masked so changed amounts and dates still match."""
+    words = PATTERNS.findall("templates.word", PATTERNS.sub("templates.digit", "0", text.lower()))
+    if len(words) < SHINGLE_WORDS:
+        return {zlib.crc32(" ".join(words).encode("utf-8"))}
+    return {zlib.crc32(" ".join(words[i:i + SHINGLE_WORDS]).encode("utf-8"))
+            for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+@lru_cache(maxsize=1)
+def _permutations():
+    import numpy as np
+    rng = np.random.default_rng(20240601)
+    # 31-bit coefficients times 32-bit shingle hashes cannot overflow uint64.
+    return (rng.integers(1, 1 << 31, NUM_HASHES, dtype=np.uint64),
+            rng.integers(0, 1 << 31, NUM_HASHES, dtype=np.uint64))
+
+
+def minhash(hashes):
+    """NUM_HASHES-long MinHash signature (uint64) of a set of 32-bit shingle hashes."""
+    import numpy as np
+    a, b = _permutations()
+    x = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+    if not len(x):
+        return np.full(NUM_HASHES, _PRIME, dtype=np.uint64)
+    return ((a[:, None] * x[None, :] + b[:, None]) % _PRIME).min(axis=1)
+
+
+def clause_signature(clause):
+    return minhash(shingles(clause))
+
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of two signatures."""
+    return float((a == b).mean())
+
+
+class TemplateIndex:
+    """Local SQLite LSH index of contract templates and their analysed clauses.
+
+    Each contract is stored with a MinHash signature over its clause
+    shingles, banded into buckets, so the nearest template of a new upload
+    is found from a few indexed bucket lookups rather than a full scan.
+    Clauses keep their own signature and analysis for reuse.
+    """
+
+    def __init__(self, path="templates.db"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        if "analysis_version" not in {row[1] for row in self._conn.execute("PRAGMA table_info(clauses)")}:
+            # Databases from before clause analyses were versioned: their analyses are never reused.
+            self._conn.execute("ALTER TABLE clauses ADD COLUMN analysis_version TEXT")
+
+    def clause_signatures(self, keys):
+        """{clause_hash: signature} of those keys stored in any template, from a single query."""
+        import numpy as np
+        keys = list(set(keys))
+        if not keys:
+            return {}
+        with self._lock:
+            # One row per hash, picked from the clauses_hash index: shared clauses recur in every version.
+            rows = self._conn.execute(f"SELECT clause_hash, signature FROM clauses WHERE rowid IN "
+                                      f"(SELECT MIN(rowid) FROM clauses WHERE clause_hash IN "
+                                      f"({','.join('?' * len(keys))}) GROUP BY clause_hash)", keys).fetchall()
+        return {key: np.frombuffer(blob, dtype=np.uint64) for key, blob in rows}
+
+    @staticmethod
+    def _bands(signature):
+        rows = NUM_HASHES // BANDS
+        return [(band, zlib.crc32(signature[band * rows:(band + 1) * rows].tobytes()))
+                for band in range(BANDS)]
+
+    def nearest(self, signature, min_similarity=MIN_SIMILARITY, text_hash=None):
+        """(template_id, text_hash, name, similarity) of the closest template, or None.
+
+        Shingles mask digits, so versions differing only in amounts or dates
+        tie; ties go to the template with ``text_hash`` itself, then to the
+        highest version number, then to the most recently added.
+        """
+        import numpy as np
+        bands = self._bands(signature)
+        query = " OR ".join(["(band = ? AND bucket = ?)"] * len(bands))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, text_hash, name, signature, COALESCE(version, 1) FROM templates "
+                f"LEFT JOIN versions ON template_id = id WHERE id IN "
+                f"(SELECT template_id FROM buckets WHERE {query})",
+                [v for pair in bands for v in pair]).fetchall()
+        best, best_key = None, None
+        for template_id, template_hash, name, blob, version in rows:
+            score = similarity(signature, np.frombuffer(blob, dtype=np.uint64))
+            key = (score, template_hash == text_hash, version, template_id)
+            if score >= min_similarity and (best is None or key > best_key):
+                best, best_key = (template_id, template_hash, name, score), key
+        return best
+
+    def template_clauses(self, template_id):
+        """(clause hashes, clause risks, clause signature matrix) of a stored template, in clause order."""
+        import numpy as np
+        with self._lock:
+            rows = self._conn.execute("SELECT clause_hash, json_extract(analysis, '$.risk'), signature FROM clauses "
+                                      "WHERE template_id = ? ORDER BY position", (template_id,)).fetchall()
+        return ([h for h, _, _ in rows], [r for _, r, _ in rows],
+                np.frombuffer(b"".join(blob for _, _, blob in rows), dtype=np.uint64).reshape(-1, NUM_HASHES))
+
+    def version(self, template_id):
+        """(version number, parent template id) of a stored contract."""
+        with self._lock:
+            row = self._conn.execute("SELECT version, parent_id FROM versions WHERE template_id = ?",
+                                     (template_id,)).fetchone()
+        return row if row else (1, None)
+
+    def add(self, text_hash, name, signature, clause_hashes, clause_signatures, analyses, parent_id=None,
+            analysis_version=None):
+        """Store an analysed contract and its clauses, as the next version of ``parent_id`` if given.
+
+        ``analysis_version`` is the analysis_version() the clause analyses
+        were made under. If the contract is already indexed, only clause analyses
+        made under another version are replaced.
+        """
+        with self._lock, self._conn:
+            cur = self._conn.execute("INSERT OR IGNORE INTO templates (text_hash, name, signature) VALUES (?, ?, ?)",
+                                     (text_hash, name, signature.tobytes()))
+            if not cur.rowcount:
+                if analysis_version is not None:
+                    # Already indexed: refresh clause analyses made under other rules.
+                    self._conn.executemany(
+                        "UPDATE clauses SET analysis = ?, analysis_version = ? WHERE template_id = "
+                        "(SELECT id FROM templates WHERE text_hash = ?) AND position = ? AND analysis_version IS NOT ?",
+                        [(json.dumps({**analysis, "span": None}, ensure_ascii=False), analysis_version, text_hash, i,
+                          analysis_version) for i, analysis in enumerate(analyses)])
+                return None
+            template_id = cur.lastrowid
+            parent = self._conn.execute("SELECT version FROM versions WHERE template_id = ?", (parent_id,)).fetchone()
+            self._conn.execute("INSERT INTO versions (template_id, parent_id, version) VALUES (?, ?, ?)",
+                               (template_id, parent_id, (parent[0] if parent else 1) + 1 if parent_id else 1))
+            self._conn.executemany("INSERT INTO buckets (band, bucket, template_id) VALUES (?, ?, ?)",
+                                   [(band, bucket, template_id) for band, bucket in self._bands(signature)])
+            self._conn.executemany(
+                "INSERT INTO clauses (template_id, position, clause_hash, signature, analysis, analysis_version) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(template_id, i, key, sig.tobytes(), json.dumps({**analysis, "span": None}, ensure_ascii=False),
+                  analysis_version)
+                 for i, (key, sig, analysis) in enumerate(zip(clause_hashes, clause_signatures, analyses))])
+        return template_id
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM templates").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+
+@lru_cache(maxsize=None)
+def open_templates(path):
+    """One TemplateIndex per database path and process."""
+    return TemplateIndex(path)
+
+
+def align_clauses(old_hashes, old_signatures, new_hashes, new_signatures):
+    """(status, previous position) of each new clause against an older version.
+
+    The common prefix and suffix are skipped and the rest is aligned on
+    clause hashes with difflib, so the work grows with the edited region.
+    Only clauses without an identical counterpart are compared by
+    signature, preferring the old clause they replace in place.
+    """
+    n, m = len(old_hashes), len(new_hashes)
+    head = 0
+    while head < min(n, m) and old_hashes[head] == new_hashes[head]:
+        head += 1
+    tail = 0
+    while tail < min(n, m) - head and old_hashes[n - 1 - tail] == new_hashes[m - 1 - tail]:
+        tail += 1
+    first = {}
+    for i in range(n - 1, -1, -1):
+        first[old_hashes[i]] = i
+    status, previous = ["unchanged"] * head, list(range(head))
+    matcher = SequenceMatcher(None, old_hashes[head:n - tail], new_hashes[head:m - tail], autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        for k in range(j2 - j1):
+            i, j = head + i1 + k, head + j1 + k
+            if tag == "equal":
+                status.append("unchanged")
+                previous.append(i)
+            elif new_hashes[j] in first:
+                status.append("moved")
+                previous.append(first[new_hashes[j]])
+            else:
+                scores = (old_signatures == new_signatures[j]).mean(axis=1)
+                best = i if i < head + i2 and scores[i] >= MIN_SIMILARITY else int(scores.argmax())
+                modified = scores[best] >= MIN_SIMILARITY
+                status.append("modified" if modified else "new")
+                previous.append(best if modified else None)
+    status += ["unchanged"] * tail
+    previous += range(n - tail, n)
+    return status, previous
+
+
+def match_template(index, text_hash, name, clause_hashes, clause_signatures, analyses, analysis_version=None):
+    """Find the nearest stored template of an analysed contract, then index the contract itself.
+
+    Returns None when nothing is similar enough. Otherwise returns the
+    template and this upload's version number in its chain. For each clause
+    of the new contract it gives:
+
+    - whether the clause is unchanged, moved, modified (a near-duplicate
+      clause exists in the template) or new;
+    - the position and risk of its counterpart in the template.
+
+    It also lists the template clauses that were removed.
+
+    An upload that differs from its nearest template is indexed as that
+    template's next version. The contract's signature is the element-wise
+    minimum of its clause signatures, i.e. the MinHash of all its shingles.
+    ``analysis_version`` is the analysis_version() of ``analyses``.
+    """
+    import numpy as np
+    if not clause_hashes:
+        return None
+    clause_signatures = np.asarray(clause_signatures, dtype=np.uint64).reshape(-1, NUM_HASHES)
+    signature = clause_signatures.min(axis=0)
+    found = index.nearest(signature, text_hash=text_hash)
+    result, parent_id = None, None
+    if found is not None:
+        template_id, template_hash, template_name, score = found
+        template_hashes, template_risks, template_sigs = index.template_clauses(template_id)
+        status, previous = align_clauses(template_hashes, template_sigs, clause_hashes, clause_signatures)
+        version = index.version(template_id)[0]
+        if template_hash != text_hash:
+            parent_id, version = template_id, version + 1
+        kept = set(previous)
+        result = {
+            "text_hash": template_hash, "name": template_name, "similarity": round(score, 3), "version": version,
+            "clauses": status, "previous": previous,
+            "previous_risk": [None if i is None else template_risks[i] for i in previous],
+            "removed": [{"position": i, "risk": risk} for i, risk in enumerate(template_risks) if i not in kept],
+        }
+    index.add(text_hash, name, signature, clause_hashes, clause_signatures, analyses, parent_id, analysis_version)
+    return result
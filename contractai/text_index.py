@@ -0,0 +1,440 @@
+import atexit
+import json
+import mmap
+import os
+import sqlite3
+import struct
+import sys
+import threading
+
+from contractai.patterns import PATTERNS
+
+# Buffered tokens that trigger writing a new segment.
+SEGMENT_TOKENS = 10_000_000
+_DTYPES = ("<u1", "<u2", "<u4")
+_HEADER = struct.Struct("<IIBBB")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    doc_id INTEGER PRIMARY KEY,
+    text_hash TEXT NOT NULL UNIQUE,
+    name TEXT,
+    type TEXT,
+    risk TEXT,
+    tokens INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS docs_type_risk ON docs (type, risk);
+CREATE INDEX IF NOT EXISTS docs_risk ON docs (risk);
+CREATE TABLE IF NOT EXISTS segments (
+    id INTEGER PRIMARY KEY,
+    first_doc INTEGER NOT NULL,
+    tokens INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS terms (
+    term TEXT NOT NULL,
+    segment INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    PRIMARY KEY (term, segment)
+) WITHOUT ROWID;
+"""
+
+
+def document_tokens(text):
+    """(distinct terms, term number of every token) of a normalized document text."""
+    import numpy as np
+    terms = {}
+    ids = [terms.setdefault(token, len(terms)) for token in PATTERNS.findall("text_index.token", text.lower())]
+    return list(terms), np.asarray(ids, dtype=np.int32)
+
+
+def _query_terms(text):
+    from contractai.hindi import normalize_hindi
+    if PATTERNS.search("hindi.devanagari", text):
+        text = normalize_hindi(text)
+    return PATTERNS.findall("text_index.token", text.lower())
+
+
+def _pack(values):
+    top = int(values.max()) if len(values) else 0
+    code = 0 if top < 1 << 8 else 1 if top < 1 << 16 else 2
+    return code, values.astype(_DTYPES[code]).tobytes()
+
+
+def encode_postings(docs, counts, positions):
+    """One term's postings as bytes: delta-encoded doc ids, positions per doc and
+    positions (restarting at each doc), each array in the narrowest unsigned type."""
+    import numpy as np
+    starts = np.cumsum(counts) - counts
+    doc_deltas = np.diff(docs, prepend=0)
+    pos_deltas = np.diff(positions, prepend=0)
+    pos_deltas[starts] = positions[starts]
+    (a, docs_raw), (b, counts_raw), (c, pos_raw) = _pack(doc_deltas), _pack(counts), _pack(pos_deltas)
+    return _HEADER.pack(len(docs), len(positions), a, b, c) + docs_raw + counts_raw + pos_raw
+
+
+def decode_postings(buf):
+    """(doc ids, positions per doc, positions) as int64 arrays."""
+    import numpy as np
+    n, m, a, b, c = _HEADER.unpack_from(buf)
+    offset = _HEADER.size
+    doc_deltas = np.frombuffer(buf, _DTYPES[a], n, offset)
+    offset += doc_deltas.nbytes
+    counts = np.frombuffer(buf, _DTYPES[b], n, offset).astype(np.int64)
+    offset += n * np.dtype(_DTYPES[b]).itemsize
+    pos_deltas = np.frombuffer(buf, _DTYPES[c], m, offset).astype(np.int64)
+    starts = np.cumsum(counts) - counts
+    running = np.cumsum(pos_deltas)
+    positions = running - np.repeat(running[starts] - pos_deltas[starts], counts)
+    return np.cumsum(doc_deltas, dtype=np.int64), counts, positions
+
+
+def _group(term_ids, doc_ids, positions):
+    """Yield (term id, docs, counts, positions) from token arrays sorted by term, doc and position."""
+    import numpy as np
+    bounds = np.flatnonzero(np.r_[True, term_ids[1:] != term_ids[:-1], True])
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        docs = doc_ids[start:end]
+        firsts = np.flatnonzero(np.r_[True, docs[1:] != docs[:-1]])
+        yield int(term_ids[start]), docs[firsts], np.diff(np.r_[firsts, end - start]), positions[start:end]
+
+
+def parse_query(query):
+    """Parse a boolean query into a tree of ("or"|"and", [nodes]), ("not", node) and ("phrase", [terms]).
+
+    Words and "quoted phrases" are ANDed unless joined by OR; NOT or a leading
+    "-" excludes; parentheses group. A word that tokenizes into several terms,
+    like non-compete, is matched as a phrase.
+    """
+    tokens = []
+    for m in PATTERNS.finditer("text_index.query", query):
+        negate, phrase, word, paren = m.group(1) or m.group(3), m.group(2), m.group(4), m.group(5)
+        if paren:
+            tokens.append((paren, None))
+        elif word in ("AND", "OR", "NOT"):
+            tokens.append((word, None))
+        else:
+            terms = _query_terms(phrase if phrase is not None else word)
+            if not terms:
+                continue
+            if negate:
+                tokens.append(("NOT", None))
+            tokens.append(("phrase", terms))
+    pos = 0
+
+    def peek():
+        return tokens[pos][0] if pos < len(tokens) else None
+
+    def parse_or():
+        nonlocal pos
+        nodes = [parse_and()]
+        while peek() == "OR":
+            pos += 1
+            nodes.append(parse_and())
+        return nodes[0] if len(nodes) == 1 else ("or", nodes)
+
+    def parse_and():
+        nonlocal pos
+        nodes = []
+        while peek() not in (None, "OR", ")"):
+            if peek() == "AND":
+                pos += 1
+                continue
+            nodes.append(parse_not())
+        if not nodes:
+            raise ValueError(f"empty expression in query {query!r}")
+        return nodes[0] if len(nodes) == 1 else ("and", nodes)
+
+    def parse_not():
+        nonlocal pos
+        if pos == len(tokens):
+            raise ValueError(f"query {query!r} ends after an operator")
+        kind, value = tokens[pos]
+        pos += 1
+        if kind == "NOT":
+            return ("not", parse_not())
+        if kind == "(":
+            node = parse_or()
+            if peek() != ")":
+                raise ValueError(f"unbalanced parentheses in query {query!r}")
+            pos += 1
+            return node
+        if kind == "phrase":
+            return ("phrase", value)
+        raise ValueError(f"unexpected {kind!r} in query {query!r}")
+
+    tree = parse_or()
+    if pos != len(tokens):
+        raise ValueError(f"unbalanced parentheses in query {query!r}")
+    return tree
+
+
+class TextIndex:
+    """Positional inverted index over normalized contract text, on disk in a directory.
+
+    Added documents are buffered and written as immutable segments
+    (seg_<id>.post, memory-mapped for queries) with the term dictionary and
+    document metadata in SQLite (index.db). A new segment at least as large
+    as the one before it is merged into it, so segment count stays
+    logarithmic. One process writes at a time; any number may query.
+
+    Buffered documents are written once they hold ``segment_tokens`` tokens
+    and, if ``flush_interval`` is set, at most that many seconds after the
+    first of them was added, from a background timer. They are flushed on
+    close and at interpreter exit.
+    """
+
+    def __init__(self, path="text_index", segment_tokens=SEGMENT_TOKENS, flush_interval=None):
+        self.path = path
+        self.segment_tokens = segment_tokens
+        self.flush_interval = flush_interval
+        os.makedirs(path, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(path, "index.db"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._maps = {}
+        self._pending = []  # (text_hash, name, type, risk, terms, ids)
+        self._pending_hashes = set()
+        self._pending_tokens = 0
+        self._timer = None
+        atexit.register(self.close)
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    def __contains__(self, text_hash):
+        with self._lock:
+            return text_hash in self._pending_hashes or self._conn.execute(
+                "SELECT 1 FROM docs WHERE text_hash = ?", (text_hash,)).fetchone() is not None
+
+    def add_tokens(self, text_hash, name, type, risk, terms, ids):
+        """Buffer a document given as document_tokens(); False if already indexed."""
+        if text_hash in self:
+            return False
+        with self._lock:
+            self._pending.append((text_hash, name, type, risk, terms, ids))
+            self._pending_hashes.add(text_hash)
+            self._pending_tokens += len(ids)
+            full = self._pending_tokens >= self.segment_tokens
+            if not full and self.flush_interval is not None and self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+        return True
+
+    def add(self, text_hash, name, type, risk, text):
+        """Buffer a document's normalized text (document_text); it is searchable once flushed."""
+        return self.add_tokens(text_hash, name, type, risk, *document_tokens(text))
+
+    def _segment_path(self, segment):
+        return os.path.join(self.path, f"seg_{segment:06d}.post")
+
+    def _write_segment(self, postings):
+        """Write (term, docs, counts, positions) postings in term order as a new segment; returns its id and term rows."""
+        segment = (self._conn.execute("SELECT MAX(id) FROM segments").fetchone()[0] or 0) + 1
+        rows, offset = [], 0
+        with open(self._segment_path(segment), "wb") as f:
+            for term, docs, counts, positions in postings:
+                block = encode_postings(docs, counts, positions)
+                f.write(block)
+                rows.append((term, segment, offset, len(block)))
+                offset += len(block)
+        return segment, rows
+
+    def flush(self):
+        """Write buffered documents as a segment, then merge small trailing segments."""
+        import numpy as np
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return
+            first_doc = (self._conn.execute("SELECT MAX(doc_id) FROM docs").fetchone()[0] or 0) + 1
+            vocabulary, term_ids, doc_ids, positions, docs = {}, [], [], [], []
+            for doc_id, (text_hash, name, type, risk, terms, ids) in enumerate(self._pending, first_doc):
+                local = np.fromiter((vocabulary.setdefault(t, len(vocabulary)) for t in terms), np.int64, len(terms))
+                term_ids.append(local[ids])
+                doc_ids.append(np.full(len(ids), doc_id, dtype=np.int64))
+                positions.append(np.arange(len(ids), dtype=np.int64))
+                docs.append((doc_id, text_hash, name, type, risk, len(ids)))
+            term_ids, doc_ids, positions = np.concatenate(term_ids), np.concatenate(doc_ids), np.concatenate(positions)
+            # Tokens are already in (doc, position) order, so a stable sort by term is enough.
+            order = np.argsort(term_ids, kind="stable")
+            names = list(vocabulary)
+            segment, rows = self._write_segment(
+                (names[t], d, c, p) for t, d, c, p in _group(term_ids[order], doc_ids[order], positions[order]))
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO docs (doc_id, text_hash, name, type, risk, tokens) VALUES (?, ?, ?, ?, ?, ?)", docs)
+                self._conn.executemany("INSERT INTO terms (term, segment, offset, length) VALUES (?, ?, ?, ?)", rows)
+                self._conn.execute("INSERT INTO segments (id, first_doc, tokens) VALUES (?, ?, ?)",
+                                   (segment, first_doc, len(term_ids)))
+            self._pending, self._pending_hashes, self._pending_tokens = [], set(), 0
+            while self._merge_tail():
+                pass
+
+    def _merge_tail(self):
+        """Merge the last segment into the one before it when it is at least as large."""
+        import numpy as np
+        tail = self._conn.execute("SELECT id, first_doc, tokens FROM segments ORDER BY first_doc DESC LIMIT 2").fetchall()
+        if len(tail) < 2 or tail[0][2] < tail[1][2]:
+            return False
+        (last, _, last_tokens), (prev, first_doc, prev_tokens) = tail
+        merged = {}
+        for term, segment, offset, length in self._conn.execute(
+                "SELECT term, segment, offset, length FROM terms WHERE segment IN (?, ?)", (prev, last)):
+            merged.setdefault(term, {})[segment] = decode_postings(self._segment(segment)[offset:offset + length])
+        segment, rows = self._write_segment(
+            (term, *(np.concatenate([parts[s][i] for s in (prev, last) if s in parts]) for i in range(3)))
+            for term, parts in merged.items())
+        with self._conn:
+            self._conn.execute("DELETE FROM terms WHERE segment IN (?, ?)", (prev, last))
+            self._conn.execute("DELETE FROM segments WHERE id IN (?, ?)", (prev, last))
+            self._conn.executemany("INSERT INTO terms (term, segment, offset, length) VALUES (?, ?, ?, ?)", rows)
+            self._conn.execute("INSERT INTO segments (id, first_doc, tokens) VALUES (?, ?, ?)",
+                               (segment, first_doc, prev_tokens + last_tokens))
+        for old in (prev, last):
+            mapped = self._maps.pop(old, None)
+            if mapped is not None:
+                mapped.close()
+            os.remove(self._segment_path(old))
+        return True
+
+    def _segment(self, segment):
+        mapped = self._maps.get(segment)
+        if mapped is None:
+            with open(self._segment_path(segment), "rb") as f:
+                mapped = self._maps[segment] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(mapped)
+
+    def _postings(self, terms):
+        """term -> (docs, counts, positions) across all segments, in doc order."""
+        import numpy as np
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT t.term, t.segment, t.offset, t.length FROM terms t JOIN segments s ON s.id = t.segment "
+                f"WHERE t.term IN ({','.join('?' * len(terms))}) ORDER BY s.first_doc", list(terms)).fetchall()
+            parts = {}
+            for term, segment, offset, length in rows:
+                parts.setdefault(term, []).append(decode_postings(self._segment(segment)[offset:offset + length]))
+        empty = np.empty(0, dtype=np.int64)
+        return {term: tuple(np.concatenate([p[i] for p in parts[term]]) for i in range(3)) if term in parts
+                else (empty, empty, empty) for term in terms}
+
+    def _phrase(self, terms, postings):
+        import numpy as np
+        if len(terms) == 1:
+            return postings[terms[0]][0]
+        # One int64 key per occurrence: doc id in the high bits, phrase start position in the low.
+        # Postings are in (doc, position) order, so every key array is already sorted; starting
+        # from the rarest term, each step is a binary search of the survivors in the next array.
+        keys = None
+        for offset, term in sorted(enumerate(terms), key=lambda item: len(postings[item[1]][2])):
+            docs, counts, positions = postings[term]
+            found = (np.repeat(docs, counts) << 32) + positions - offset
+            if keys is None:
+                keys = found
+                continue
+            at = np.searchsorted(found, keys)
+            keys = keys[(at < len(found)) & (found[np.minimum(at, len(found) - 1)] == keys)] if len(found) else found
+            if not len(keys):
+                break
+        return np.unique(keys >> 32)
+
+    def _evaluate(self, node, postings, universe):
+        import numpy as np
+        kind, value = node
+        if kind == "phrase":
+            return self._phrase(value, postings)
+        if kind == "not":
+            return np.setdiff1d(universe(), self._evaluate(value, postings, universe), assume_unique=True)
+        if kind == "or":
+            result = np.empty(0, dtype=np.int64)
+            for child in value:
+                result = np.union1d(result, self._evaluate(child, postings, universe))
+            return result
+        included = [c for c in value if c[0] != "not"]
+        result = universe() if not included else None
+        for child in sorted(included, key=lambda c: c[0] != "phrase"):
+            found = self._evaluate(child, postings, universe)
+            result = found if result is None else np.intersect1d(result, found, assume_unique=True)
+        for child in value:
+            if child[0] == "not":
+                result = np.setdiff1d(result, self._evaluate(child[1], postings, universe), assume_unique=True)
+        return result
+
+    def search(self, query, type=None, risk=None, limit=100):
+        """(total matches, newest-first matching docs) for a boolean/phrase query, optionally filtered."""
+        import numpy as np
+        tree = parse_query(query)
+        terms, stack = set(), [tree]
+        while stack:
+            kind, value = stack.pop()
+            if kind == "phrase":
+                terms.update(value)
+            elif kind == "not":
+                stack.append(value)
+            else:
+                stack.extend(value)
+        postings = self._postings(sorted(terms))
+        where, params = [], []
+        for column, wanted in (("type", type), ("risk", risk)):
+            if wanted is not None:
+                where.append(f"{column} = ?")
+                params.append(wanted)
+
+        def universe():
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT doc_id FROM docs{' WHERE ' + ' AND '.join(where) if where else ''} ORDER BY doc_id",
+                    params).fetchall()
+            return np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+
+        matches = self._evaluate(tree, postings, universe)
+        if where:
+            matches = np.intersect1d(matches, universe(), assume_unique=True)
+        newest = matches[::-1][:limit].tolist()
+        if not newest:
+            return len(matches), []
+        with self._lock:
+            rows = {r[0]: r for r in self._conn.execute(
+                f"SELECT doc_id, text_hash, name, type, risk FROM docs WHERE doc_id IN ({','.join('?' * len(newest))})",
+                newest)}
+        return len(matches), [{"text_hash": rows[d][1], "name": rows[d][2], "type": rows[d][3], "risk": rows[d][4]}
+                              for d in newest if d in rows]
+
+    @property
+    def pending(self):
+        """Number of buffered documents not yet searchable."""
+        return len(self._pending)
+
+    def close(self):
+        if self._conn is None:
+            return
+        self.flush()
+        atexit.unregister(self.close)
+        for mapped in self._maps.values():
+            mapped.close()
+        self._maps.clear()
+        self._conn.close()
+        self._conn = None
+
+
+def search_main(args):
+    index = TextIndex(args.index)
+    try:
+        total, hits = index.search(args.query, args.type, args.risk, args.limit)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    finally:
+        index.close()
+    for hit in hits:
+        print(json.dumps(hit, ensure_ascii=False))
+    print(f"{total} matching contracts", file=sys.stderr)
+    return 0
@@ -0,0 +1,80 @@
+from typing import NotRequired, Optional, TypedDict
+
+
+class RuleMatch(TypedDict):
+    term: str
+    start: int
+    end: int
+
+
+class ClauseSpan(TypedDict):
+    start: int
+    end: int
+    heading: str
+    number: Optional[int]
+
+
+class ClauseAnalysis(TypedDict):
+    text: str
+    risk: str
+    reasons: list[str]
+    explanation: str
+    suggestion: Optional[str]
+    matches: list[RuleMatch]
+    span: Optional[ClauseSpan]
+
+
+class AmountRecord(TypedDict):
+    raw: str
+    value_paise: Optional[int]
+    unit: str
+    start: int
+    end: int
+    context: Optional[str]
+
+
+class StageStats(TypedDict, total=False):
+    seconds: float
+    calls: int
+    peak_kb: float
+
+
+class RemovedClause(TypedDict):
+    position: int
+    risk: str
+
+
+class TemplateMatch(TypedDict):
+    text_hash: str
+    name: Optional[str]
+    similarity: float
+    version: int
+    clauses: list[str]
+    previous: list[Optional[int]]
+    previous_risk: list[Optional[str]]
+    removed: list[RemovedClause]
+    reused_clauses: int
+
+
+class Analysis(TypedDict):
+    text_hash: str
+    type: str
+    type_confidence: dict[str, float]
+    risk: str
+    parties: dict[str, str]
+    amounts: list[str]
+    amount_records: list[AmountRecord]
+    jurisdiction: dict[str, str]
+    clauses: list[ClauseAnalysis]
+    template: Optional[TemplateMatch]
+    stages: dict[str, StageStats]
+    text: NotRequired[str]
+
+
+class ReportData(TypedDict):
+    type: str
+    risk: str
+    parties: dict[str, str]
+    amounts: list[str]
+    jurisdiction: str
+    clauses: list[ClauseAnalysis]
@@ -0,0 +1,66 @@
+import random
+import re
+
+import pytest
+
+from contractai.pipeline import extract_clauses, index_clauses, iter_clause_spans
+
+FRAGMENTS = ["\n", "\n\n", " ", "  ", "\t", "\n1.", "\n12.", "\n3", ".", "Clause 4", "Clause\n7", "Clause",
+             "Section 2", "Section  10", "section 5", "tenant shall pay rent", "the vendor", "indemnity", "1,000",
+             "पक्ष", "a", "b", " " * 70, "\n" + "0" * 70]
+
+
+def reference_clauses(text):
+    """The original splitter, before clauses were indexed as spans."""
+    clauses = re.split(r'\n\d+\.|Clause\s+\d+|Section\s+\d+', text)
+    return [c.strip() for c in clauses if len(c.strip()) > 25]
+
+
+def random_text(rng):
+    return "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 120)))
+
+
+def random_chunks(text, rng):
+    cuts = sorted(rng.sample(range(len(text) + 1), min(len(text) + 1, rng.randint(0, 12))))
+    return [text[a:b] for a, b in zip([0] + cuts, cuts + [len(text)])]
+
+
+def test_extract_clauses_matches_re_split():
+    rng = random.Random(20)
+    for _ in range(2000):
+        text = random_text(rng)
+        assert extract_clauses(text) == reference_clauses(text), text
+
+
+def test_incremental_spans_match_whole_text_on_random_chunks():
+    rng = random.Random(21)
+    for _ in range(2000):
+        text = random_text(rng)
+        chunks = random_chunks(text, rng)
+        assert "".join(chunks) == text
+        streamed = list(iter_clause_spans(chunks))
+        assert [span for span, _ in streamed] == index_clauses(text), chunks
+        assert [clause for _, clause in streamed] == reference_clauses(text), chunks
+        for span, clause in streamed:
+            assert text[span["start"]:span["end"]] == clause
+
+
+def test_single_character_chunks():
+    text = "Preamble of the agreement between the parties.\n1. The tenant shall pay rent monthly in advance." \
+           "\n2. Either party may terminate with notice.Clause 3 Disputes go to arbitration in Mumbai, India."
+    streamed = list(iter_clause_spans(list(text)))
+    assert [clause for _, clause in streamed] == reference_clauses(text)
+    assert [span["number"] for span, _ in streamed] == [None, 1, 2, 3]
+
+
+@pytest.mark.parametrize("head,rest", [
+    ("Section" + " " * 66, " " * 10 + "10 Body of the section, long enough to count."),
+    ("Clause" + "\n" * 100, "7 Body of the clause, long enough to count as one."),
+    ("\n" + "1" * 100, "2. Body of the numbered clause, long enough to count."),
+], ids=["section", "clause", "numbered"])
+def test_heading_split_after_long_run(head, rest):
+    chunks = ["The preamble, long enough to be a clause. Here is the first clause." + head,
+              rest + "\n3. The last clause, which arrives in the same piece.", "\n"]
+    text = "".join(chunks)
+    assert [clause for _, clause in iter_clause_spans(chunks)] == reference_clauses(text)
+    assert len(reference_clauses(text)) == 3
@@ -0,0 +1,38 @@
+import random
+
+import pytest
+
+from contractai.matcher import AUTOMATON_MIN_TERMS, TermMatcher
+from contractai.pipeline import RULE_MATCHER
+
+
+def brute_force(terms, text):
+    hits = [(i, i + len(term), term) for term in set(terms) for i in range(len(text)) if text.startswith(term, i)]
+    return sorted(hits, key=lambda hit: (hit[1], hit[0]))
+
+
+def random_word(rng, alphabet, longest):
+    return "".join(rng.choice(alphabet) for _ in range(rng.randint(1, longest)))
+
+
+@pytest.mark.parametrize("size", [1, 3, 12, AUTOMATON_MIN_TERMS, 200])
+def test_find_and_automaton_agree_with_brute_force(size):
+    rng = random.Random(size)
+    for _ in range(300):
+        terms = [random_word(rng, "abc ", 5) for _ in range(size)]
+        text = random_word(rng, "abcd ", 80)
+        expected = brute_force(terms, text)
+        assert TermMatcher(terms, automaton=False).find(text) == expected, (terms, text)
+        assert TermMatcher(terms, automaton=True).find(text) == expected, (terms, text)
+
+
+def test_strategy_switches_at_automaton_min_terms():
+    terms = [f"term {i}" for i in range(AUTOMATON_MIN_TERMS)]
+    assert not TermMatcher(terms[:-1]).automaton
+    assert TermMatcher(terms).automaton
+    assert not RULE_MATCHER.automaton
+
+
+def test_duplicate_terms_are_reported_once():
+    assert TermMatcher(["notice", "notice", "without notice"]).find("terminate without notice") == [
+        (10, 24, "without notice"), (18, 24, "notice")]
@@ -0,0 +1,67 @@
+import pytest
+
+from contractai.pipeline import (SCAN_OVERLAP, TEXT_CHUNK_CHARS, analyze_contract, document_text, extract_jurisdiction,
+                                 extract_parties)
+
+FILLER = "\n".join(f"{i}. The parties agree to the terms of clause {i} of this agreement." for i in range(60))
+
+
+def pdf(*pages):
+    pymupdf = pytest.importorskip("pymupdf")
+    doc = pymupdf.open()
+    for text in pages:
+        assert doc.new_page().insert_textbox(pymupdf.Rect(30, 30, 580, 820), text, fontsize=6) >= 0
+    return doc.tobytes()
+
+
+def txt(*chunks):
+    """A TXT upload whose read chunks are exactly the given ones, each padded to a full chunk."""
+    return "".join(chunk.rjust(TEXT_CHUNK_CHARS, ".") for chunk in chunks[:-1]).encode() + chunks[-1].encode()
+
+
+def assert_matches_whole_text(data, name="contract.pdf"):
+    text = document_text(data, name)
+    assert len(text) > 2 * SCAN_OVERLAP
+    result = analyze_contract(data, name)
+    assert result["parties"] == extract_parties(text)
+    assert result["jurisdiction"] == extract_jurisdiction(text)
+    return result
+
+
+def test_parties_on_different_pages():
+    result = assert_matches_whole_text(pdf(
+        "LEASE AGREEMENT\nLandlord: Ravi Kumar\n\n" + FILLER,
+        FILLER + "\nTenant: Priya Sharma\n\nThis agreement is governed by the laws of India, as amended.",
+    ))
+    assert result["parties"] == {"Landlord": "Ravi Kumar", "Tenant": "Priya Sharma"}
+    assert result["jurisdiction"] == {"Governing Law": "India"}
+
+
+def test_between_and_across_page_break():
+    result = assert_matches_whole_text(pdf(
+        "SERVICE AGREEMENT\n" + FILLER + "\nThis agreement is made BETWEEN Acme Services Pvt Ltd",
+        "AND Ravi Kumar (the Client)\n\n" + FILLER + "\nSubject to the exclusive jurisdiction of courts at Pune.",
+    ))
+    assert result["parties"]["Party 2"] == "Ravi Kumar"
+
+
+def test_jurisdiction_on_a_later_page():
+    result = assert_matches_whole_text(pdf(FILLER, FILLER, "The courts at Mumbai shall have jurisdiction.\n\n" + FILLER))
+    assert result["jurisdiction"]["Jurisdiction"] == "Mumbai"
+
+
+def test_jurisdiction_priority_across_pages():
+    result = assert_matches_whole_text(pdf(
+        "The laws of India governing this lease apply.\n" + FILLER,
+        FILLER + "\nThis agreement is governed by the laws of Maharashtra, as amended.",
+    ))
+    assert result["jurisdiction"] == {"Governing Law": "Maharashtra"}
+
+
+@pytest.mark.parametrize("make,name", [(pdf, "contract.pdf"), (txt, "contract.txt")])
+def test_jurisdiction_not_cut_at_page_end(make, name):
+    result = assert_matches_whole_text(make(
+        FILLER + "\nDisputes are settled under the laws of India and the parties\n",
+        "agree to arbitration.\n" + FILLER,
+    ), name)
+    assert result["jurisdiction"] == {}
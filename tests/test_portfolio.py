@@ -0,0 +1,47 @@
+import random
+
+import numpy as np
+
+from contractai.amounts import parse_amount
+from contractai.portfolio import parse_amounts
+
+INT64_MAX = np.iinfo(np.int64).max
+
+
+def digits(rng, low, high):
+    return "".join(rng.choice("0123456789") for _ in range(rng.randint(low, high)))
+
+
+def random_amount(rng):
+    whole = digits(rng, 1, 22)
+    if rng.random() < 0.5:
+        whole = ",".join(reversed([whole[max(0, i - 3):i] for i in range(len(whole), 0, -3)]))
+    raw = rng.choice(["", "INR ", "Rs.", "Rs ", "₹", "rent of "]) + whole
+    if rng.random() < 0.5:
+        raw += "." + digits(rng, 0, 14)
+    if rng.random() < 0.05:
+        raw += "9" * rng.randint(20, 40)
+    if rng.random() < 0.4:
+        raw += rng.choice([" Lakh", " Lakhs", " crore", " CRORES", " lakh"])
+    if rng.random() < 0.2:
+        raw += rng.choice([" and ", ", ", "."]) + digits(rng, 1, 6)
+    return raw if rng.random() > 0.05 else rng.choice(["", "abc", "Rs.", "₹ ,", "Lakh"])
+
+
+def expected(raw):
+    paise = parse_amount(raw)[0]
+    return -1 if paise is None or paise > INT64_MAX else paise
+
+
+def test_parse_amounts_matches_parse_amount():
+    rng = random.Random(8)
+    raws = [random_amount(rng) for _ in range(50_000)]
+    assert parse_amounts(raws).tolist() == [expected(raw) for raw in raws]
+
+
+def test_parse_amounts_edges():
+    raws = ["INR 3.149", "1.99999999999999999999999999999999", "Rs. 92,233,720,368,547,758.07", "Rs. 92233720368547758.08",
+            "99,999 Crores", "no amount", ""]
+    assert parse_amounts(raws).tolist() == [314, 199, INT64_MAX, -1, 99_999 * 10**9, -1, -1]
+    assert parse_amounts([]).dtype == np.int64
+    assert parse_amount("1." + "9" * 40) == (199, "INR")
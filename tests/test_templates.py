@@ -0,0 +1,61 @@
+import numpy as np
+
+from contractai.templates import TemplateIndex, align_clauses, clause_hash, clause_signature, match_template
+
+CLAUSES = [
+    "1. The Tenant shall pay a monthly rent of INR 25,000 on or before the fifth day of each month.",
+    "2. The Tenant shall pay a security deposit of INR 1,00,000 refundable at the end of the lease term.",
+    "3. Either party may terminate this lease by giving the other party two months written notice.",
+    "4. The Landlord shall carry out all structural repairs to the premises at the Landlord's own cost.",
+    "5. This lease shall be governed by the laws of India and the courts at Mumbai shall have jurisdiction.",
+]
+
+
+def signed(clauses):
+    return [clause_hash(c) for c in clauses], np.array([clause_signature(c) for c in clauses])
+
+
+def align(old, new):
+    return align_clauses(*signed(old), *signed(new))
+
+
+def test_align_unchanged():
+    assert align(CLAUSES, CLAUSES) == (["unchanged"] * 5, [0, 1, 2, 3, 4])
+
+
+def test_align_modified_new_and_removed():
+    new = list(CLAUSES)
+    new[1] = new[1].replace("1,00,000", "2,00,000")
+    new[3] = "4. The Tenant shall not keep pets, hold parties or sublet any part of the flat to anyone."
+    del new[2]
+    status, previous = align(CLAUSES, new)
+    assert status == ["unchanged", "modified", "new", "unchanged"]
+    assert previous == [0, 1, None, 4]
+
+
+def test_align_moved():
+    new = [CLAUSES[0], CLAUSES[3], CLAUSES[1], CLAUSES[2], CLAUSES[4]]
+    status, previous = align(CLAUSES, new)
+    assert sorted(zip(status, previous), key=lambda p: p[1]) == [
+        ("unchanged", 0), ("unchanged", 1), ("unchanged", 2), ("moved", 3), ("unchanged", 4)]
+
+
+def upload(index, clauses, name):
+    hashes, signatures = signed(clauses)
+    text_hash = clause_hash("\n".join(clauses))
+    return match_template(index, text_hash, name, hashes, signatures, [{"risk": "LOW"}] * len(clauses))
+
+
+def test_versions_differing_only_in_amounts(tmp_path):
+    index = TemplateIndex(str(tmp_path / "templates.db"))
+    versions = [[CLAUSES[0].replace("25,000", rent)] + CLAUSES[1:] for rent in ("25,000", "27,500", "30,000")]
+    assert upload(index, versions[0], "v1") is None
+    second = upload(index, versions[1], "v2")
+    assert (second["name"], second["version"], second["similarity"]) == ("v1", 2, 1.0)
+    third = upload(index, versions[2], "v3")
+    assert (third["name"], third["version"]) == ("v2", 3)
+    assert (third["clauses"], third["previous"]) == (["modified"] + ["unchanged"] * 4, [0, 1, 2, 3, 4])
+    again = upload(index, versions[2], "v3 again")
+    assert (again["name"], again["version"], again["clauses"]) == ("v3", 3, ["unchanged"] * 5)
+    assert index.count() == 3
+    index.close()
@@ -0,0 +1,89 @@
+import random
+
+import numpy as np
+import pytest
+
+from contractai.text_index import TextIndex, decode_postings, document_tokens, encode_postings, parse_query
+
+WORDS = ["tenant", "landlord", "shall", "pay", "rent", "unlimited", "indemnity", "sole", "arbitrator", "notice",
+         "vendor", "client", "security", "deposit"]
+TYPES = ["LEASE", "SERVICE", "EMPLOYMENT"]
+RISKS = ["LOW", "MEDIUM", "HIGH"]
+
+
+def random_postings(rng, docs, max_gap, max_position):
+    doc_ids = np.cumsum(rng.integers(1 if docs else 0, max_gap + 1, docs)).astype(np.int64)
+    counts = rng.integers(1, 6, docs).astype(np.int64)
+    positions = np.concatenate([np.sort(rng.choice(max_position, n, replace=False)) for n in counts]
+                               ) if docs else np.empty(0, dtype=np.int64)
+    return doc_ids, counts, positions.astype(np.int64)
+
+
+@pytest.mark.parametrize("max_gap,max_position", [(3, 50), (1000, 60000), (100_000, 5_000_000)])
+def test_postings_round_trip(max_gap, max_position):
+    rng = np.random.default_rng(max_gap)
+    for docs in (0, 1, 2, 50, 500):
+        postings = random_postings(rng, docs, max_gap, max_position)
+        decoded = decode_postings(encode_postings(*postings))
+        for want, got in zip(postings, decoded):
+            assert got.dtype == np.int64
+            np.testing.assert_array_equal(got, want)
+
+
+def matches(node, tokens):
+    kind, value = node
+    if kind == "phrase":
+        return any(tokens[i:i + len(value)] == value for i in range(len(tokens) - len(value) + 1))
+    if kind == "not":
+        return not matches(value, tokens)
+    if kind == "or":
+        return any(matches(child, tokens) for child in value)
+    return all(matches(child, tokens) for child in value)
+
+
+def random_query(rng):
+    def atom():
+        roll = rng.random()
+        if roll < 0.3:
+            return f'"{" ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 3)))}"'
+        if roll < 0.4:
+            return f"({atom()} OR {atom()})"
+        return rng.choice(["", "", "-", "NOT "]) + rng.choice(WORDS)
+    query = " ".join(atom() for _ in range(rng.randint(1, 3)))
+    return query if not query.startswith(("-", "NOT")) or rng.random() < 0.5 else query + " " + rng.choice(WORDS)
+
+
+def test_queries_match_brute_force(tmp_path):
+    rng = random.Random(25)
+    index = TextIndex(str(tmp_path / "index"), segment_tokens=300)
+    docs = []
+    for n in range(400):
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 30)))
+        docs.append((f"hash-{n}", rng.choice(TYPES), rng.choice(RISKS), text.split()))
+        assert index.add(f"hash-{n}", f"doc-{n}", docs[-1][1], docs[-1][2], text)
+    assert not index.add("hash-0", "again", "LEASE", "LOW", "tenant")
+    index.close()
+
+    index = TextIndex(str(tmp_path / "index"))
+    assert len(index) == len(docs)
+    for _ in range(300):
+        query = random_query(rng)
+        type, risk = rng.choice([None, *TYPES]), rng.choice([None, *RISKS])
+        tree = parse_query(query)
+        expected = [h for h, t, r, tokens in reversed(docs)
+                    if (type is None or t == type) and (risk is None or r == risk) and matches(tree, tokens)]
+        total, hits = index.search(query, type, risk, limit=25)
+        assert total == len(expected), query
+        assert [hit["text_hash"] for hit in hits] == expected[:25], query
+    index.close()
+
+
+def test_document_tokens():
+    terms, ids = document_tokens("The tenant pays; the Tenant stays.")
+    assert [terms[i] for i in ids] == ["the", "tenant", "pays", "the", "tenant", "stays"]
+
+
+@pytest.mark.parametrize("query", ["", "tenant OR", "NOT", "(tenant", "tenant)", "AND"])
+def test_malformed_queries(query):
+    with pytest.raises(ValueError):
+        parse_query(query)